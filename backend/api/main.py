@@ -1,6 +1,12 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from .routers import connectors, migrations
+from ..core.connectors.pool import close_pools
+from ..core.migration.instrumentation import metrics
 
 app = FastAPI(
     title="UniversalMigrate API",
@@ -17,6 +23,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def configure_driver_threads():
+    # Blocking database driver calls run in the default executor; size it for concurrent jobs
+    max_workers = int(os.environ.get("UNIVERSALMIGRATE_DRIVER_THREADS", "32"))
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max_workers))
+
+@app.on_event("shutdown")
+async def close_connection_pools():
+    await asyncio.to_thread(close_pools)
+
 # Include routers
 app.include_router(connectors.router)
 app.include_router(migrations.router)
@@ -29,6 +45,12 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+if os.environ.get("UNIVERSALMIGRATE_METRICS_ENABLED", "true").lower() == "true":
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def prometheus_metrics():
+        """Stage timings and counters in Prometheus text format"""
+        return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
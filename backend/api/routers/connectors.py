@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
 from ...core.connectors.base import SchemaObject
 from ...core.connectors.salesforce.connector import SalesforceConnector, SalesforceConfig
@@ -23,6 +23,17 @@ class SQLServerCredentials(BaseModel):
     database: str
     username: str = None
     password: str = None
+    load_method: str = "executemany"
+    commit_interval: int = 0
+    fetch_arraysize: int = 5000
+    pool_min_size: int = 0
+    pool_max_size: int = 20
+
+class SchemaObjectPage(BaseModel):
+    total: int
+    offset: int
+    limit: Optional[int]
+    items: List[Dict[str, Any]]
 
 # In-memory store for connectors (would be a database in production)
 active_connectors = {}
@@ -67,12 +78,17 @@ async def create_sqlserver_connector(credentials: SQLServerCredentials):
     connector_id = str(uuid.uuid4())
     
     config = SQLServerConfig(
-        credentials=credentials.dict()
+        credentials=credentials.dict(exclude={"load_method", "commit_interval", "fetch_arraysize", "pool_min_size", "pool_max_size"}),
+        load_method=credentials.load_method,
+        commit_interval=credentials.commit_interval,
+        fetch_arraysize=credentials.fetch_arraysize,
+        pool_min_size=credentials.pool_min_size,
+        pool_max_size=credentials.pool_max_size
     )
     
     connector = SQLServerConnector(config)
     
-    # Test the connection
+    # Test the connection; disconnecting keeps it warm in the connector's pool
     try:
         await connector.connect()
         status = "connected"
@@ -94,26 +110,114 @@ async def create_sqlserver_connector(credentials: SQLServerCredentials):
     )
 
 @router.get("/{connector_id}/schema", response_model=List[Dict[str, Any]])
-async def get_connector_schema(connector_id: str):
-    """Get the schema for a connector"""
-    if connector_id not in active_connectors:
-        raise HTTPException(status_code=404, detail="Connector not found")
+async def get_connector_schema(connector_id: str,
+                               response: Response,
+                               offset: int = Query(0, ge=0),
+                               limit: Optional[int] = Query(None, ge=1),
+                               name: Optional[str] = None,
+                               schema_name: Optional[str] = None):
+    """Get the schema for a connector, optionally filtered and paginated.
     
-    connector = active_connectors[connector_id]["connector"]
+    The total number of matching objects is returned in the X-Total-Count header.
+    """
+    connector = _request_connector(connector_id)
     
     try:
-        schema = await connector.get_schema()
-        return [s.dict() for s in schema]
+        total, objects = await _list_objects(connector, name, schema_name, None, offset, limit)
+        response.headers["X-Total-Count"] = str(total)
+        # Names repeat across schemas, so each object carries its own
+        return [dict(obj.dict(), schema=schema) for schema, obj in objects]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Hand this request's connection back to the pool
+        await connector.disconnect()
 
-@router.delete("/{connector_id}", response_model=Dict[str, str])
-async def delete_connector(connector_id: str):
-    """Delete a connector"""
+@router.get("/{connector_id}/objects", response_model=SchemaObjectPage)
+async def list_connector_objects(connector_id: str,
+                                 offset: int = Query(0, ge=0),
+                                 limit: Optional[int] = Query(100, ge=1, le=1000),
+                                 name: Optional[str] = None,
+                                 schema_name: Optional[str] = None,
+                                 type: Optional[str] = None):
+    """List a connector's tables and views without columns"""
+    connector = _request_connector(connector_id)
+    
+    try:
+        total, objects = await _list_objects(connector, name, schema_name, type, offset, limit)
+        return SchemaObjectPage(total=total, offset=offset, limit=limit, items=[{
+            "name": obj.name,
+            "schema": schema,
+            "type": obj.type,
+            "description": obj.description,
+            "column_count": len(obj.fields)
+        } for schema, obj in objects])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await connector.disconnect()
+
+@router.get("/{connector_id}/objects/{object_name}", response_model=Dict[str, Any])
+async def get_connector_object(connector_id: str, object_name: str):
+    """Get one table or view with its columns; object_name may be schema-qualified (dbo.Orders)"""
+    connector = _request_connector(connector_id)
+    
+    try:
+        schema_object = await _get_object_schema(connector, object_name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await connector.disconnect()
+    
+    if schema_object is None:
+        raise HTTPException(status_code=404, detail="Object not found")
+    
+    return schema_object.dict()
+
+def _get_connector(connector_id: str):
     if connector_id not in active_connectors:
         raise HTTPException(status_code=404, detail="Connector not found")
     
-    connector = active_connectors[connector_id]["connector"]
+    return active_connectors[connector_id]["connector"]
+
+def _request_connector(connector_id: str):
+    """A copy of a registered connector with its own connection, for the length of one request.
+    
+    Jobs and other requests may be using the registered connector's connection, so catalog
+    queries never run on it and disconnecting afterwards releases only this copy's connection.
+    """
+    connector = _get_connector(connector_id)
+    return type(connector)(connector.config)
+
+async def _list_objects(connector, name: Optional[str], schema_name: Optional[str], object_type: Optional[str],
+                        offset: int, limit: Optional[int]) -> Tuple[int, List[Tuple[Optional[str], SchemaObject]]]:
+    """Filter and page a connector's objects as (schema name, object), natively when the connector supports it"""
+    if hasattr(connector, "list_objects"):
+        return await connector.list_objects(name, schema_name, object_type, offset, limit)
+    
+    # Connectors without object listing have no schema names to filter on
+    if schema_name:
+        return 0, []
+    matches = [
+        obj for obj in await connector.get_schema()
+        if (not name or name.lower() in obj.name.lower()) and (not object_type or obj.type == object_type)
+    ]
+    page = matches[offset:offset + limit] if limit is not None else matches[offset:]
+    return len(matches), [(None, obj) for obj in page]
+
+async def _get_object_schema(connector, object_name: str) -> Optional[SchemaObject]:
+    if hasattr(connector, "get_object_schema"):
+        return await connector.get_object_schema(object_name)
+    
+    for obj in await connector.get_schema():
+        if obj.name == object_name:
+            return obj
+    return None
+
+@router.delete("/{connector_id}", response_model=Dict[str, str])
+async def delete_connector(connector_id: str):
+    """Delete a connector"""
+    connector = _get_connector(connector_id)
     await connector.disconnect()
     
     del active_connectors[connector_id]
@@ -1,7 +1,12 @@
+import asyncio
+import json
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse, FileResponse
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from ...core.migration.engine import MigrationConfig, MigrationScheduler, MappingDefinition
+from ...core.migration.staging import validate_stage_id
+from ...core.migration.validation import VALIDATION_METHODS
 
 router = APIRouter(prefix="/migrations", tags=["migrations"])
 
@@ -12,65 +17,263 @@ class FieldMapping(BaseModel):
     source_field: str
     target_field: str
     transformation: Optional[str] = None
+    transformation_args: Optional[Dict[str, Any]] = None
 
-class MigrationRequest(BaseModel):
+class MigrationOptions(BaseModel):
+    batch_size: int = 1000
+    queue_depth: int = 4
+    loader_workers: int = 1
+    extract_partitions: int = 1
+    sync_mode: str = "full"
+    watermark_column: Optional[str] = None
+    change_tracking: bool = False
+    merge_keys: Optional[List[str]] = None
+    profile: bool = False
+    adaptive_batching: bool = False
+    min_batch_size: int = 100
+    max_batch_size: int = 50000
+    memory_budget_mb: int = 512
+    staging: bool = False
+    keep_stage: bool = False
+    # "isolate" dead-letters rows the target rejects and keeps loading; "abort" fails the job
+    error_mode: str = "abort"
+    max_errors: Optional[int] = None
+    convert_types: bool = True
+
+class MigrationRequest(MigrationOptions):
     source_connector_id: str
     target_connector_id: str
     source_object: str
     target_object: str
     field_mappings: List[FieldMapping]
-    batch_size: int = 1000
+    # Load an existing complete stage (e.g. one kept by an earlier job) instead of the source
+    stage_id: Optional[str] = None
+    # Key of an incremental sync's high-water mark; defaults to the connections and objects
+    sync_id: Optional[str] = None
+
+class TableMapping(BaseModel):
+    source_object: str
+    target_object: str
+    field_mappings: List[FieldMapping]
+
+class ProjectMigrationRequest(MigrationOptions):
+    source_connector_id: str
+    target_connector_id: str
+    tables: List[TableMapping]
+    # Tables copied at once; defaults to the scheduler's job limit
+    max_parallel_tables: Optional[int] = None
+
+class VerificationRequest(BaseModel):
+    # "server" checksums key ranges in the database, "client" streams hashes; "auto" picks server when both sides support it
+    method: str = "auto"
+    partitions: int = 16
+    leaf_rows: int = 10000
+    # Source column rows are matched on, for sources without a single-column primary key
+    key_column: Optional[str] = None
+    # Target column holding key_column; defaults to the column it is mapped to
+    target_key_column: Optional[str] = None
 
 class MigrationResponse(BaseModel):
     job_id: str
     status: str
 
+class ProjectResponse(BaseModel):
+    project_id: str
+    status: str
+
 from .connectors import active_connectors
 
 @router.post("/", response_model=MigrationResponse)
 async def create_migration(request: MigrationRequest):
-    """Create and start a new migration job"""
+    """Create a new migration job and queue it to run in the background"""
+    if request.stage_id is not None:
+        try:
+            validate_stage_id(request.stage_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    source_connector, target_connector = _get_connectors(request.source_connector_id, request.target_connector_id)
+    
+    # Create migration config
+    config = _build_config(source_connector, target_connector, request.source_object, request.target_object,
+                           request.field_mappings, request, stage_id=request.stage_id, sync_id=request.sync_id)
+    
+    # Schedule the migration
+    job_id = await migration_scheduler.schedule_migration(config)
+    
+    return MigrationResponse(
+        job_id=job_id,
+        status=migration_scheduler.get_job_status(job_id)["status"]
+    )
+
+@router.post("/projects", response_model=ProjectResponse)
+async def create_project_migration(request: ProjectMigrationRequest):
+    """Migrate a set of tables, ordered by their foreign keys and run in parallel"""
+    if not request.tables:
+        raise HTTPException(status_code=400, detail="A project needs at least one table")
+    
+    source_connector, target_connector = _get_connectors(request.source_connector_id, request.target_connector_id)
+    
+    configs = [
+        _build_config(source_connector, target_connector, table.source_object, table.target_object,
+                      table.field_mappings, request)
+        for table in request.tables
+    ]
+    project_id = await migration_scheduler.schedule_project(configs, request.max_parallel_tables)
+    
+    return ProjectResponse(
+        project_id=project_id,
+        status=migration_scheduler.get_project_status(project_id)["status"]
+    )
+
+@router.get("/projects/{project_id}", response_model=Dict[str, Any])
+async def get_project_status(project_id: str):
+    """Get the status of a project migration and each of its table jobs"""
+    status = migration_scheduler.get_project_status(project_id)
+    
+    if status["status"] == "not_found":
+        raise HTTPException(status_code=404, detail="Project migration not found")
+    
+    return status
+
+def _get_connectors(source_connector_id: str, target_connector_id: str) -> Any:
+    """Look up the source and target connectors of a request"""
     # Validate connectors exist
-    if request.source_connector_id not in active_connectors:
+    if source_connector_id not in active_connectors:
         raise HTTPException(status_code=404, detail="Source connector not found")
     
-    if request.target_connector_id not in active_connectors:
+    if target_connector_id not in active_connectors:
         raise HTTPException(status_code=404, detail="Target connector not found")
     
-    source_connector = active_connectors[request.source_connector_id]["connector"]
-    target_connector = active_connectors[request.target_connector_id]["connector"]
-    
-    # Create mapping definitions
+    return active_connectors[source_connector_id]["connector"], active_connectors[target_connector_id]["connector"]
+
+def _build_config(source_connector: Any, target_connector: Any, source_object: str, target_object: str,
+                  field_mappings: List[FieldMapping], options: MigrationOptions,
+                  stage_id: Optional[str] = None, sync_id: Optional[str] = None) -> MigrationConfig:
+    """Create the engine config for one table"""
     mappings = [MappingDefinition(
         source_field=m.source_field,
         target_field=m.target_field,
-        transformation=m.transformation
-    ) for m in request.field_mappings]
+        transformation=m.transformation,
+        transformation_args=m.transformation_args
+    ) for m in field_mappings]
     
-    # Create migration config
-    config = MigrationConfig(
+    return MigrationConfig(
         source_connector=source_connector,
         target_connector=target_connector,
-        source_object=request.source_object,
-        target_object=request.target_object,
+        source_object=source_object,
+        target_object=target_object,
         field_mappings=mappings,
-        batch_size=request.batch_size
+        batch_size=options.batch_size,
+        queue_depth=options.queue_depth,
+        loader_workers=options.loader_workers,
+        extract_partitions=options.extract_partitions,
+        sync_mode=options.sync_mode,
+        watermark_column=options.watermark_column,
+        change_tracking=options.change_tracking,
+        merge_keys=options.merge_keys,
+        sync_id=sync_id,
+        profile=options.profile,
+        adaptive_batching=options.adaptive_batching,
+        min_batch_size=options.min_batch_size,
+        max_batch_size=options.max_batch_size,
+        memory_budget_mb=options.memory_budget_mb,
+        staging=options.staging or stage_id is not None,
+        stage_id=stage_id,
+        keep_stage=options.keep_stage,
+        error_mode=options.error_mode,
+        max_errors=options.max_errors,
+        convert_types=options.convert_types
     )
+
+@router.get("/{job_id}", response_model=Dict[str, Any])
+async def get_migration_status(job_id: str):
+    """Get the status of a migration job"""
+    status = migration_scheduler.get_job_status(job_id)
     
-    # Schedule the migration
-    job_id = await migration_scheduler.schedule_migration(config)
+    if status["status"] == "not_found":
+        raise HTTPException(status_code=404, detail="Migration job not found")
+    
+    return status
+
+@router.post("/{job_id}/resume", response_model=MigrationResponse)
+async def resume_migration(job_id: str):
+    """Resume a migration job from its last checkpoint"""
+    try:
+        found = await migration_scheduler.resume_migration(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if not found:
+        raise HTTPException(status_code=404, detail="Migration job not found")
     
     return MigrationResponse(
         job_id=job_id,
-        status="scheduled"
+        status=migration_scheduler.get_job_status(job_id)["status"]
     )
 
-@router.get("/{job_id}", response_model=Dict[str, Any])
-async def get_migration_status(job_id: str):
-    """Get the status of a migration job"""
+@router.post("/{job_id}/verify", response_model=Dict[str, Any])
+async def verify_migration(job_id: str, request: Optional[VerificationRequest] = None):
+    """Compare a job's source and target by row counts and per-range checksums in the background"""
+    request = request or VerificationRequest()
+    if request.method not in VALIDATION_METHODS:
+        raise HTTPException(status_code=400, detail=f"Unknown validation method: {request.method}")
+    try:
+        found = await migration_scheduler.verify_migration(job_id, request.method, request.partitions, request.leaf_rows,
+                                                           request.key_column, request.target_key_column)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if not found:
+        raise HTTPException(status_code=404, detail="Migration job not found")
+    
+    return migration_scheduler.get_verification(job_id)
+
+@router.get("/{job_id}/verification", response_model=Dict[str, Any])
+async def get_verification(job_id: str):
+    """Get the latest verification result of a job"""
+    verification = migration_scheduler.get_verification(job_id)
+    
+    if verification is None:
+        raise HTTPException(status_code=404, detail="No verification found for this job")
+    
+    return verification
+
+@router.get("/{job_id}/events")
+async def stream_migration_events(job_id: str):
+    """Stream a job's progress events as server-sent events until it finishes"""
+    progress = migration_scheduler.get_job_progress(job_id)
+    
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Migration job not found")
+    
+    async def event_stream():
+        events = progress.subscribe()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keep idle connections open through proxies
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+        finally:
+            progress.unsubscribe(events)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@router.get("/{job_id}/profile")
+async def download_migration_profile(job_id: str, kind: str = "pstats"):
+    """Download a profiled job's cProfile dump (kind=pstats) or allocation report (kind=memory)"""
     status = migration_scheduler.get_job_status(job_id)
     
     if status["status"] == "not_found":
         raise HTTPException(status_code=404, detail="Migration job not found")
     
-    return status
+    profile = status.get("profile")
+    if not isinstance(profile, dict) or kind not in profile:
+        raise HTTPException(status_code=404, detail="No profile available for this job")
+    
+    return FileResponse(profile[kind], filename=f"{job_id}.{kind}" if kind == "pstats" else f"{job_id}.memory.txt")
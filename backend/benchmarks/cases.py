@@ -0,0 +1,147 @@
+from typing import Dict, List, Any
+from ..core.connectors.base import ConnectorConfig
+from ..core.connectors.pool import close_pools
+from ..core.connectors.sqlserver import connector as sqlserver_module
+from ..core.connectors.sqlserver.connector import SQLServerConnector, SQLServerConfig
+from ..core.migration.engine import MigrationEngine, MigrationConfig, MappingDefinition
+from ..core.migration.instrumentation import Instrumentation
+from ..core.migration.transforms import compile_mappings
+from .fakes import InMemoryConnector, FakePyodbc, make_rows
+
+BATCH_SIZE = 1000
+
+class Benchmark:
+    """One benchmark case; only run() is timed and measured for memory"""
+    name = "benchmark"
+
+    def setup(self, rows: int, columns: int) -> None:
+        self.rows = rows
+        self.columns = columns
+
+    async def run(self) -> Dict[str, Any]:
+        """Do the measured work; returns extra figures to report alongside the timing"""
+        return {}
+
+    def teardown(self) -> None:
+        pass
+
+def _mappings(columns: List[str]) -> List[MappingDefinition]:
+    """Copy every column, stripping the string ones"""
+    mappings = []
+    for i, column in enumerate(columns):
+        if i > 0 and i % 4 == 0:
+            mappings.append(MappingDefinition(column, column, "strip"))
+        else:
+            mappings.append(MappingDefinition(column, column))
+    return mappings
+
+class EngineMigrate(Benchmark):
+    """Full extract/transform/load pipeline between in-memory connectors"""
+    name = "engine.migrate"
+
+    def setup(self, rows: int, columns: int) -> None:
+        super().setup(rows, columns)
+        self.data = make_rows(rows, columns)
+
+    async def run(self) -> Dict[str, Any]:
+        source = InMemoryConnector(ConnectorConfig(), self.data)
+        target = InMemoryConnector(ConnectorConfig())
+        config = MigrationConfig(source, target, "source", "target", _mappings(self.data.columns), batch_size=BATCH_SIZE)
+        # A plain Instrumentation keeps benchmark runs out of the process-wide metrics
+        result = await MigrationEngine(Instrumentation()).migrate(config)
+        if result.get("status") != "completed" or target.loaded != self.rows:
+            raise RuntimeError(f"Migration did not complete: {result}")
+        return {"load_calls": target.load_calls}
+
+class TransformData(Benchmark):
+    """Compiled field mappings applied to columnar batches"""
+    name = "engine.transform_data"
+
+    def setup(self, rows: int, columns: int) -> None:
+        super().setup(rows, columns)
+        data = make_rows(rows, columns)
+        self.batches = [data.slice(start, start + BATCH_SIZE) for start in range(0, rows, BATCH_SIZE)]
+        self.plan = compile_mappings(_mappings(data.columns))
+        self.engine = MigrationEngine(Instrumentation())
+
+    async def run(self) -> Dict[str, Any]:
+        for batch in self.batches:
+            await self.engine._transform_data(batch, self.plan)
+        return {}
+
+class SQLServerBenchmark(Benchmark):
+    """Runs SQLServerConnector against a SQLite database standing in for pyodbc"""
+    def setup(self, rows: int, columns: int) -> None:
+        super().setup(rows, columns)
+        self.fake = FakePyodbc()
+        self._pyodbc = sqlserver_module.pyodbc
+        sqlserver_module.pyodbc = self.fake
+        # Pools are keyed by connection string, so drop any pool holding another run's fake
+        close_pools()
+        self.data = make_rows(rows, columns)
+
+    def connector(self, **options: Any) -> SQLServerConnector:
+        credentials = {"server": "benchmark", "database": "benchmark"}
+        return SQLServerConnector(SQLServerConfig(credentials=credentials, **options))
+
+    def teardown(self) -> None:
+        close_pools()
+        sqlserver_module.pyodbc = self._pyodbc
+        self.fake.sqlite.close()
+
+class SQLServerExtract(SQLServerBenchmark):
+    """Streaming extract through iter_batches in compact mode"""
+    name = "sqlserver.extract"
+
+    def setup(self, rows: int, columns: int) -> None:
+        super().setup(rows, columns)
+        self.fake.create_table("source", self.data)
+
+    async def run(self) -> Dict[str, Any]:
+        connector = self.connector()
+        await connector.connect()
+        self.fake.counter.round_trips = 0
+        extracted = 0
+        try:
+            async for batch in connector.iter_batches(object_name="source", batch_size=BATCH_SIZE, compact=True):
+                extracted += len(batch)
+        finally:
+            await connector.disconnect()
+        if extracted != self.rows:
+            raise RuntimeError(f"Extracted {extracted} of {self.rows} rows")
+        return {"round_trips": self.fake.counter.round_trips}
+
+class SQLServerLoad(SQLServerBenchmark):
+    """load_data with one of the connector's load methods"""
+    def __init__(self, load_method: str):
+        self.load_method = load_method
+        self.name = f"sqlserver.load.{load_method}"
+
+    def setup(self, rows: int, columns: int) -> None:
+        super().setup(rows, columns)
+        self.fake.create_table("target", self.data, fill=False)
+        self.batches = [self.data.slice(start, start + BATCH_SIZE) for start in range(0, rows, BATCH_SIZE)]
+
+    async def run(self) -> Dict[str, Any]:
+        connector = self.connector(load_method=self.load_method)
+        await connector.connect()
+        self.fake.counter.round_trips = 0
+        loaded = 0
+        try:
+            for batch in self.batches:
+                loaded += await connector.load_data("target", batch)
+        finally:
+            await connector.disconnect()
+        if loaded != self.rows:
+            raise RuntimeError(f"Loaded {loaded} of {self.rows} rows")
+        return {"round_trips": self.fake.counter.round_trips}
+
+def all_benchmarks() -> List[Benchmark]:
+    return [
+        EngineMigrate(),
+        TransformData(),
+        SQLServerExtract(),
+        SQLServerLoad("executemany"),
+        SQLServerLoad("values"),
+        SQLServerLoad("row")
+    ]
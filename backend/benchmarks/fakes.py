@@ -0,0 +1,153 @@
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Any, Optional, AsyncIterator, Union
+from ..core.connectors.base import BaseConnector, ConnectorConfig
+from ..core.connectors.record_batch import RecordBatch
+
+def make_rows(row_count: int, column_count: int) -> RecordBatch:
+    """Deterministic rows with an integer key and a mix of string, number and date columns"""
+    columns = ["id"] + [f"col_{i}" for i in range(1, column_count)]
+    data = [list(range(1, row_count + 1))]
+    for i in range(1, column_count):
+        kind = i % 4
+        if kind == 0:
+            data.append([f" value {n} " for n in range(row_count)])
+        elif kind == 1:
+            data.append([n * i for n in range(row_count)])
+        elif kind == 2:
+            data.append([Decimal(n) / 100 for n in range(row_count)])
+        else:
+            data.append([datetime(2024, 1, 1 + n % 28) for n in range(row_count)])
+    return RecordBatch(columns, data)
+
+class InMemoryConnector(BaseConnector):
+    """Connector over an in-memory RecordBatch, used as source or sink in benchmarks"""
+
+    supports_record_batch = True
+
+    def __init__(self, config: ConnectorConfig, rows: Optional[RecordBatch] = None):
+        super().__init__(config)
+        self.rows = rows if rows is not None else RecordBatch([], [])
+        self.loaded = 0
+        self.load_calls = 0
+
+    async def connect(self) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+    async def get_schema(self) -> List[Any]:
+        return []
+
+    async def extract_data(self, query: Optional[str] = None, object_name: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.rows.to_records()
+
+    async def iter_batches(self, object_name: Optional[str] = None, batch_size: Optional[int] = None,
+                           compact: bool = False, **kwargs: Any) -> AsyncIterator[Union[List[Dict[str, Any]], RecordBatch]]:
+        batch_size = batch_size or 1000
+        for start in range(0, self.rows.num_rows, batch_size):
+            batch = self.rows.slice(start, start + batch_size)
+            yield batch if compact else batch.to_records()
+
+    async def load_data(self, target_object: str, data: Union[List[Dict[str, Any]], RecordBatch], **kwargs: Any) -> int:
+        self.load_calls += 1
+        self.loaded += len(data)
+        return len(data)
+
+class RoundTripCounter:
+    """Counts driver calls that would each be one network round-trip to SQL Server"""
+    def __init__(self):
+        self.round_trips = 0
+        self.rows_sent = 0
+
+class FakeCursor:
+    """pyodbc-style cursor over SQLite that counts round-trips"""
+    def __init__(self, connection: "FakeConnection"):
+        self._connection = connection
+        self._cursor = connection.sqlite.cursor()
+        self.fast_executemany = False
+        self.arraysize = 1
+
+    @property
+    def description(self) -> Any:
+        return self._cursor.description
+
+    def execute(self, sql: str, *params: Any) -> "FakeCursor":
+        # pyodbc accepts both execute(sql, a, b) and execute(sql, [a, b])
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = tuple(params[0])
+        self._connection.counter.round_trips += 1
+        self._cursor.execute(sql, _to_sqlite(params))
+        return self
+
+    def executemany(self, sql: str, rows: List[tuple]) -> None:
+        counter = self._connection.counter
+        # fast_executemany ships the whole parameter array at once; otherwise pyodbc sends one row per call
+        counter.round_trips += 1 if self.fast_executemany else len(rows)
+        counter.rows_sent += len(rows)
+        self._cursor.executemany(sql, [_to_sqlite(row) for row in rows])
+
+    def fetchone(self) -> Any:
+        return self._cursor.fetchone()
+
+    def fetchall(self) -> List[tuple]:
+        self._connection.counter.round_trips += 1
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size: Optional[int] = None) -> List[tuple]:
+        self._connection.counter.round_trips += 1
+        return self._cursor.fetchmany(size or self.arraysize)
+
+    def close(self) -> None:
+        self._cursor.close()
+
+class FakeConnection:
+    """pyodbc-style connection backed by a shared SQLite database"""
+    def __init__(self, sqlite: sqlite3.Connection, counter: RoundTripCounter):
+        self.sqlite = sqlite
+        self.counter = counter
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def commit(self) -> None:
+        self.counter.round_trips += 1
+        self.sqlite.commit()
+
+    def rollback(self) -> None:
+        self.sqlite.rollback()
+
+    def add_output_converter(self, sql_type: int, func: Any) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+class FakePyodbc:
+    """Stand-in for the pyodbc module: every connect() shares one in-memory SQLite database"""
+    # The exception classes the connector catches, as SQLite raises them
+    DataError = sqlite3.DataError
+    IntegrityError = sqlite3.IntegrityError
+
+    def __init__(self):
+        self.counter = RoundTripCounter()
+        self.sqlite = sqlite3.connect(":memory:", check_same_thread=False)
+
+    def connect(self, connection_string: str) -> FakeConnection:
+        return FakeConnection(self.sqlite, self.counter)
+
+    def create_table(self, name: str, batch: RecordBatch, fill: bool = True) -> None:
+        """Create a table shaped like batch, optionally filled with its rows"""
+        self.sqlite.execute(f"DROP TABLE IF EXISTS {name}")
+        column_defs = ", ".join(f"{column} {'INTEGER PRIMARY KEY' if i == 0 else ''}" for i, column in enumerate(batch.columns))
+        self.sqlite.execute(f"CREATE TABLE {name} ({column_defs})")
+        if fill:
+            placeholders = ", ".join("?" * len(batch.columns))
+            self.sqlite.executemany(f"INSERT INTO {name} VALUES ({placeholders})", [_to_sqlite(row) for row in batch.rows()])
+        self.sqlite.commit()
+
+def _to_sqlite(values: Any) -> tuple:
+    """SQLite has no Decimal or datetime types; store them as text like a driver would bind them"""
+    return tuple(str(value) if isinstance(value, (Decimal, datetime)) else value for value in values)
@@ -0,0 +1,159 @@
+"""Run the performance benchmarks and compare them with stored baselines.
+
+Usage (from the repository root):
+
+    python -m backend.benchmarks.run                     # run and compare with baselines.json
+    python -m backend.benchmarks.run --save-baseline     # run and store the results as the new baseline
+    python -m backend.benchmarks.run --quick --filter sqlserver.load
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Any, Optional
+from .cases import Benchmark, all_benchmarks
+
+ROW_COUNTS = [1000, 10000, 100000]
+COLUMN_COUNTS = [5, 20, 50]
+QUICK_ROW_COUNTS = [1000, 10000]
+QUICK_COLUMN_COUNTS = [5, 20]
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+def case_key(benchmark: Benchmark, rows: int, columns: int) -> str:
+    return f"{benchmark.name}[rows={rows},cols={columns}]"
+
+def measure(benchmark: Benchmark, rows: int, columns: int, repeat: int) -> Dict[str, Any]:
+    """Best-of-repeat wall time and the highest Python heap peak across the runs"""
+    timings = []
+    peak_bytes = 0
+    extra: Dict[str, Any] = {}
+    for _ in range(repeat):
+        benchmark.setup(rows, columns)
+        try:
+            tracemalloc.start()
+            started = time.perf_counter()
+            extra = asyncio.run(benchmark.run())
+            timings.append(time.perf_counter() - started)
+            peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+            benchmark.teardown()
+
+    # tracemalloc slows allocation-heavy code, so compare runs with each other, not with production
+    best = min(timings)
+    return {
+        "rows": rows,
+        "columns": columns,
+        "seconds": round(best, 6),
+        "rows_per_second": round(rows / best, 1) if best > 0 else None,
+        "peak_memory_bytes": peak_bytes,
+        **extra
+    }
+
+def compare(results: Dict[str, Dict[str, Any]], baselines: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """Describe every case that is slower or uses more memory than its baseline allows"""
+    regressions = []
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if not baseline:
+            continue
+        if baseline.get("rows_per_second") and result["rows_per_second"] is not None:
+            if result["rows_per_second"] < baseline["rows_per_second"] * (1 - tolerance):
+                regressions.append(
+                    f"{key}: {result['rows_per_second']:.0f} rows/s, baseline {baseline['rows_per_second']:.0f} rows/s"
+                )
+        if baseline.get("peak_memory_bytes"):
+            if result["peak_memory_bytes"] > baseline["peak_memory_bytes"] * (1 + tolerance):
+                regressions.append(
+                    f"{key}: peak {_mebibytes(result['peak_memory_bytes'])}, "
+                    f"baseline {_mebibytes(baseline['peak_memory_bytes'])}"
+                )
+    return regressions
+
+def load_baselines(path: str) -> Dict[str, Dict[str, Any]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+def save_baselines(path: str, results: Dict[str, Dict[str, Any]]) -> None:
+    # Keep baselines for cases that were not part of this run
+    merged = load_baselines(path)
+    merged.update(results)
+    document = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "saved_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": dict(sorted(merged.items()))
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+
+def _mebibytes(value: int) -> str:
+    return f"{value / (1024 * 1024):.1f} MiB"
+
+def _format_delta(result: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> str:
+    if not baseline or not baseline.get("rows_per_second") or result["rows_per_second"] is None:
+        return ""
+    change = result["rows_per_second"] / baseline["rows_per_second"] - 1
+    return f"{change:+.1%}"
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="UniversalMigrate performance benchmarks")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="Smaller row counts and column widths")
+    parser.add_argument("--rows", type=int, nargs="+", help="Row counts to run")
+    parser.add_argument("--columns", type=int, nargs="+", help="Column widths to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is reported")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare with or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown or memory growth before a case counts as a regression")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    row_counts = args.rows or (QUICK_ROW_COUNTS if args.quick else ROW_COUNTS)
+    column_counts = args.columns or (QUICK_COLUMN_COUNTS if args.quick else COLUMN_COUNTS)
+    benchmarks = [b for b in all_benchmarks() if not args.filter or args.filter in b.name]
+    baselines = load_baselines(args.baseline)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'case':<50} {'rows/s':>12} {'peak':>10} {'vs baseline':>12}")
+    for benchmark in benchmarks:
+        for rows in row_counts:
+            for columns in column_counts:
+                key = case_key(benchmark, rows, columns)
+                result = measure(benchmark, rows, columns, max(args.repeat, 1))
+                results[key] = result
+                rate = f"{result['rows_per_second']:.0f}" if result["rows_per_second"] is not None else "-"
+                print(f"{key:<50} {rate:>12} {_mebibytes(result['peak_memory_bytes']):>10} "
+                      f"{_format_delta(result, baselines.get(key)):>12}", flush=True)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        save_baselines(args.baseline, results)
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baselines, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    if not baselines:
+        print(f"\nNo baselines at {args.baseline}; run with --save-baseline to record them")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Callable, Tuple
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time"""
+    pass
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections shared by connectors with the same settings.
+
+    Idle connections older than idle_timeout are closed; each checkout runs health_check
+    on an idle connection and replaces it if the check fails. Threads wait for a free
+    connection with acquire(), coroutines with acquire_async(), which keeps waiting tasks
+    on the event loop instead of parking a worker thread each.
+    """
+    def __init__(self,
+                 factory: Callable[[], Any],
+                 min_size: int = 0,
+                 max_size: int = 10,
+                 idle_timeout: float = 300.0,
+                 health_check: Optional[Callable[[Any], None]] = None):
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        # (event loop, future) of each acquire_async() call waiting for a free connection
+        self._waiters = deque()
+
+    @property
+    def size(self) -> int:
+        """Number of open connections, idle or checked out"""
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Check out a connection, creating one if the pool has room; blocks when exhausted"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._condition:
+                checkout = self._checkout()
+                if checkout is None:
+                    self._condition.wait(self._remaining(deadline, timeout))
+                    continue
+            connection = self._prepare(checkout[0])
+            if connection is not None:
+                return connection
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> Any:
+        """Check out a connection like acquire(), waiting on the event loop when exhausted.
+
+        Only the login or health check of the connection handed out runs in a worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._condition:
+                checkout = self._checkout()
+                if checkout is None:
+                    remaining = self._remaining(deadline, timeout)
+                    waiter = (loop, loop.create_future())
+                    self._waiters.append(waiter)
+            if checkout is None:
+                try:
+                    # Unlike wait_for, wait() never swallows a cancellation that races the wake-up
+                    await asyncio.wait([waiter[1]], timeout=remaining)
+                except asyncio.CancelledError:
+                    with self._condition:
+                        if waiter in self._waiters:
+                            self._waiters.remove(waiter)
+                        else:
+                            # Pass on a wake-up this task can no longer use
+                            self._wake_waiter()
+                    raise
+                with self._condition:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                continue
+
+            prepare = asyncio.ensure_future(asyncio.to_thread(self._prepare, checkout[0]))
+            try:
+                connection = await asyncio.shield(prepare)
+            except asyncio.CancelledError:
+                # The login finishes in its thread regardless; return what it opens to the pool
+                prepare.add_done_callback(self._release_abandoned)
+                raise
+            if connection is not None:
+                return connection
+
+    def release(self, connection: Any, discard: bool = False) -> None:
+        """Return a connection to the pool, or close it when discard is set"""
+        if not discard:
+            try:
+                # Never hand out a connection with an open transaction
+                connection.rollback()
+            except Exception:
+                discard = True
+
+        with self._condition:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+            self._wake_waiter()
+
+        if discard or self._closed:
+            self._close_quietly(connection)
+
+    def fill(self) -> None:
+        """Open connections until the pool holds min_size"""
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                connection = self.factory()
+            except Exception:
+                self._forget()
+                raise
+            self.release(connection)
+
+    def close(self) -> None:
+        """Close all idle connections; checked-out ones are closed on release"""
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._size -= len(idle)
+            self._idle.clear()
+            self._condition.notify_all()
+            while self._waiters:
+                self._wake_waiter()
+        for connection in idle:
+            self._close_quietly(connection)
+
+    def _checkout(self) -> Optional[Tuple[Any]]:
+        """(idle connection,) or (None,) for a reserved new slot; None when exhausted (caller holds the lock)"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        self._prune_idle()
+        if self._idle:
+            return (self._idle.pop()[0],)
+        if self._size < self.max_size:
+            # Reserve the slot now; the slow login happens outside the lock
+            self._size += 1
+            return (None,)
+        return None
+
+    def _prepare(self, connection: Any) -> Any:
+        """Open a connection for a reserved slot, or health-check an idle one; None if it failed the check"""
+        if connection is None:
+            try:
+                return self.factory()
+            except Exception:
+                self._forget()
+                raise
+        if self._is_healthy(connection):
+            return connection
+        self._close_quietly(connection)
+        self._forget()
+        return None
+
+    def _release_abandoned(self, prepare: "asyncio.Future") -> None:
+        if not prepare.cancelled() and prepare.exception() is None and prepare.result() is not None:
+            # release() rolls back over the network, so keep it off the event loop
+            threading.Thread(target=self.release, args=(prepare.result(),), daemon=True).start()
+
+    def _remaining(self, deadline: Optional[float], timeout: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise PoolTimeoutError(f"No connection available within {timeout} seconds")
+        return remaining
+
+    def _wake_waiter(self) -> None:
+        """Wake the longest-waiting acquire_async() call, if any (caller holds the lock)"""
+        while self._waiters:
+            loop, future = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_set_done, future)
+                return
+            except RuntimeError:
+                # Its event loop has closed; try the next waiter
+                continue
+
+    def _prune_idle(self) -> None:
+        """Close connections idle past idle_timeout, keeping min_size (caller holds the lock)"""
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            connection, _ = self._idle.popleft()
+            self._size -= 1
+            self._close_quietly(connection)
+
+    def _is_healthy(self, connection: Any) -> bool:
+        if self.health_check is None:
+            return True
+        try:
+            self.health_check(connection)
+            return True
+        except Exception:
+            return False
+
+    def _forget(self) -> None:
+        """Give back a reserved slot whose connection was never handed out"""
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+            self._wake_waiter()
+
+    def _close_quietly(self, connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+def _set_done(future: "asyncio.Future") -> None:
+    if not future.done():
+        future.set_result(None)
+
+# Pools are shared process-wide, keyed by connection settings
+_pools: Dict[str, ConnectionPool] = {}
+# Options each pool was created with, callables such as health checks left out
+_pool_options: Dict[str, Dict[str, Any]] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(key: str, factory: Callable[[], Any], **options: Any) -> ConnectionPool:
+    """Get the pool for key, creating it with factory and options on first use.
+
+    A new pool opens its min_size connections in a background thread, so callers on an
+    event loop are not blocked by the logins. Asking for an existing pool with different
+    options raises ValueError rather than silently using the first caller's options.
+    """
+    settings = {name: value for name, value in options.items() if not callable(value)}
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None:
+            if _pool_options[key] != settings:
+                # The key is a connection string that may hold a password, so it is not shown
+                raise ValueError(f"A connection pool for these connection settings is already open with "
+                                 f"{_pool_options[key]}, not {settings}")
+            return pool
+        pool = _pools[key] = ConnectionPool(factory, **options)
+        _pool_options[key] = settings
+
+    if pool.min_size > 0:
+        threading.Thread(target=_fill_quietly, args=(pool,), daemon=True).start()
+    return pool
+
+def _fill_quietly(pool: ConnectionPool) -> None:
+    # A failed login here is not lost: the next acquire() tries again and raises it
+    try:
+        pool.fill()
+    except Exception:
+        pass
+
+def close_pools() -> None:
+    """Close every registered pool"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+        _pool_options.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,79 @@
+from typing import Dict, List, Any, Optional, Iterator, Sequence, Union
+
+class RecordBatch:
+    """Columnar batch of rows: column names stored once, one list of values per column"""
+    def __init__(self, columns: List[str], data: List[List[Any]], partition: Optional[int] = None):
+        if len(columns) != len(data):
+            raise ValueError("RecordBatch needs exactly one value list per column")
+        self.columns = columns
+        self.data = data
+        self.column_index = {name: i for i, name in enumerate(columns)}
+        # Index of the source key range this batch was read from, for partitioned extraction
+        self.partition = partition
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "RecordBatch":
+        """Build a batch from a list of dicts; fields missing from a record become None"""
+        columns = list(records[0].keys()) if records else []
+        seen = set(columns)
+        for record in records:
+            if len(record) != len(columns) or record.keys() != seen:
+                for key in record:
+                    if key not in seen:
+                        seen.add(key)
+                        columns.append(key)
+        return cls(columns, [[record.get(column) for record in records] for column in columns])
+
+    @classmethod
+    def from_rows(cls, columns: List[str], rows: Sequence[Sequence[Any]], partition: Optional[int] = None) -> "RecordBatch":
+        """Build a batch from row tuples sharing one column list"""
+        if not rows:
+            return cls(list(columns), [[] for _ in columns], partition)
+        return cls(list(columns), [list(values) for values in zip(*rows)], partition)
+
+    @classmethod
+    def from_arrow(cls, table: Any) -> "RecordBatch":
+        """Build a batch from a pyarrow Table or RecordBatch"""
+        return cls(list(table.column_names), [table.column(i).to_pylist() for i in range(table.num_columns)])
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.data[0]) if self.data else 0
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def column(self, name: str) -> List[Any]:
+        """Get the values of one column"""
+        return self.data[self.column_index[name]]
+
+    def rows(self) -> Iterator[tuple]:
+        """Iterate over rows as tuples in column order"""
+        return zip(*self.data)
+
+    def select(self, columns: List[str]) -> "RecordBatch":
+        """Get a batch with only the given columns, sharing their value lists"""
+        return RecordBatch(list(columns), [self.column(name) for name in columns])
+
+    def slice(self, start: int, stop: Optional[int] = None) -> "RecordBatch":
+        """Get a batch with rows [start, stop)"""
+        return RecordBatch(list(self.columns), [values[start:stop] for values in self.data], self.partition)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Convert to the list-of-dicts form"""
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows()]
+
+    def to_arrow(self) -> Any:
+        """Convert to a pyarrow Table (requires the optional pyarrow package)"""
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("pyarrow is required for RecordBatch.to_arrow")
+        return pa.table(dict(zip(self.columns, self.data)))
+
+def as_record_batch(data: Union[RecordBatch, List[Dict[str, Any]]]) -> RecordBatch:
+    """Accept either batch form and return a RecordBatch"""
+    if isinstance(data, RecordBatch):
+        return data
+    return RecordBatch.from_records(data)
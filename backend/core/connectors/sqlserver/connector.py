@@ -1,217 +1,763 @@
-from typing import Dict, List, Any, Optional
+import asyncio
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple, Union, Sequence, Callable
 import pyodbc
 from ..base import BaseConnector, ConnectorConfig, SchemaObject, SchemaField
+from ..record_batch import RecordBatch, as_record_batch
+from ..pool import ConnectionPool, get_pool
+
+# A fixed batch size, or a callable asked for the size before every fetch
+BatchSize = Union[int, Callable[[], int], None]
+
+# SQL Server caps a single statement at 2100 parameters and a VALUES list at 1000 rows
+MAX_PARAMETERS = 2100
+MAX_VALUES_ROWS = 1000
+
+# ODBC type code of datetimeoffset, which pyodbc cannot return without an output converter
+SQL_SS_TIMESTAMPOFFSET = -155
+# SQL_SS_TIMESTAMPOFFSET_STRUCT: year, month, day, hour, minute, second, nanoseconds, offset hours, offset minutes
+TIMESTAMPOFFSET_STRUCT = struct.Struct("<6hI2h")
+
+def _datetimeoffset(value: Optional[bytes]) -> Optional[datetime]:
+    """Decode a datetimeoffset value into an aware datetime"""
+    if value is None:
+        return None
+    year, month, day, hour, minute, second, nanoseconds, offset_hours, offset_minutes = TIMESTAMPOFFSET_STRUCT.unpack(value)
+    offset = timezone(timedelta(hours=offset_hours, minutes=offset_minutes))
+    return datetime(year, month, day, hour, minute, second, nanoseconds // 1000, offset)
+
+def _open_connection(connection_string: str) -> Any:
+    connection = pyodbc.connect(connection_string)
+    connection.add_output_converter(SQL_SS_TIMESTAMPOFFSET, _datetimeoffset)
+    return connection
+
+async def _cursor_call(cursor: Any, func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking call on cursor in a worker thread and return its result.
+    
+    If the awaiting task is cancelled, the statement is cancelled and the call is awaited
+    before CancelledError propagates, so the caller's cleanup never closes the cursor or
+    returns the connection to the pool while a worker thread is still using it.
+    """
+    call = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    try:
+        return await asyncio.shield(call)
+    except asyncio.CancelledError:
+        try:
+            # SQLCancel may be issued from another thread to stop a running statement
+            cursor.cancel()
+        except Exception:
+            pass
+        while not call.done():
+            try:
+                await asyncio.shield(call)
+            except asyncio.CancelledError:
+                continue
+            except Exception:
+                break
+        raise
 
 class SQLServerConfig(ConnectorConfig):
     connector_type: str = "sqlserver"
+    # How load_data writes rows: "executemany" (pyodbc fast_executemany parameter arrays),
+    # "values" (multi-row INSERT ... VALUES statements) or "row" (one execute per record)
+    load_method: str = "executemany"
+    # Commit after this many rows within a load; 0 commits once per load_data call
+    commit_interval: int = 0
+    # Rows requested per fetchmany round-trip when extracting
+    fetch_arraysize: int = 5000
+    # Connection pool shared by every connector with the same connection settings
+    pool_min_size: int = 0
+    pool_max_size: int = 20
+    # Seconds an idle pooled connection is kept before it is closed
+    pool_idle_timeout: float = 300.0
+    # Seconds connect() waits for a free connection when the pool is exhausted
+    pool_timeout: float = 30.0
+
+# Tables and views with their schema and description
+SCHEMA_OBJECTS_QUERY = """
+SELECT 
+    o.object_id,
+    o.name AS table_name,
+    SCHEMA_NAME(o.schema_id) AS schema_name,
+    CASE WHEN o.type = 'U' THEN 'table' ELSE 'view' END AS table_type,
+    p.value AS description
+FROM 
+    sys.objects o
+LEFT JOIN 
+    sys.extended_properties p ON p.major_id = o.object_id AND p.minor_id = 0 AND p.name = 'MS_Description'
+WHERE 
+    o.type IN ('U', 'V')
+ORDER BY 
+    table_name
+"""
+
+# Columns of every table and view, one row per column
+SCHEMA_COLUMNS_QUERY = """
+SELECT 
+    c.object_id,
+    c.name AS column_name,
+    t.name AS data_type,
+    c.is_nullable,
+    CASE WHEN EXISTS (
+        SELECT 1 FROM sys.index_columns ic
+        JOIN sys.indexes pk ON pk.object_id = ic.object_id AND pk.index_id = ic.index_id AND pk.is_primary_key = 1
+        WHERE ic.object_id = c.object_id AND ic.column_id = c.column_id
+    ) THEN 1 ELSE 0 END AS is_primary_key,
+    CASE WHEN fk.parent_column_id IS NOT NULL THEN OBJECT_NAME(fk.referenced_object_id) + '.' + COL_NAME(fk.referenced_object_id, fk.referenced_column_id) ELSE NULL END AS foreign_key,
+    c.default_object_id,
+    ep.value AS description
+FROM 
+    sys.columns c
+JOIN 
+    sys.objects o ON o.object_id = c.object_id AND o.type IN ('U', 'V')
+JOIN 
+    sys.types t ON c.user_type_id = t.user_type_id
+OUTER APPLY 
+    (SELECT TOP 1 * FROM sys.foreign_key_columns f WHERE f.parent_object_id = c.object_id AND f.parent_column_id = c.column_id) fk
+LEFT JOIN 
+    sys.extended_properties ep ON ep.major_id = c.object_id AND ep.minor_id = c.column_id AND ep.name = 'MS_Description'
+ORDER BY 
+    c.object_id, c.column_id
+"""
+
+class SchemaSnapshot:
+    """Introspected schema of one database with the catalog version it was read at"""
+    def __init__(self, version: Tuple[Any, ...], objects: List[SchemaObject], schema_names: List[str]):
+        self.version = version
+        self.objects = objects
+        # Owning schema (e.g. dbo) of each object, in the same order; names repeat across schemas
+        self.schema_names = schema_names
+
+# Schema snapshots shared process-wide, keyed by connection string
+_schema_cache: Dict[str, SchemaSnapshot] = {}
 
 class SQLServerConnector(BaseConnector):
     """Connector for SQL Server databases"""
     
+    # extract (compact=True) and load_data work with RecordBatch directly
+    supports_record_batch = True
+    # load_data(mode="merge") upserts on key columns
+    supports_merge = True
+    # iter_batches and the iterators built on it accept a callable batch_size
+    supports_adaptive_batches = True
+    # load_data can isolate bad rows into a rejects list instead of failing the batch
+    supports_error_isolation = True
+    
     async def connect(self) -> None:
-        """Connect to SQL Server using pyodbc"""
-        credentials = self.config.credentials
-        connection_params = self.config.connection_params
-        
+        """Check out a pooled SQL Server connection"""
         try:
-            connection_string = f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            connection_string += f"SERVER={credentials.get('server')};"
-            connection_string += f"DATABASE={credentials.get('database')};"
-            
-            # Use trusted connection if no username/password provided
-            if credentials.get('username') and credentials.get('password'):
-                connection_string += f"UID={credentials.get('username')};"
-                connection_string += f"PWD={credentials.get('password')};"
-            else:
-                connection_string += "Trusted_Connection=yes;"
-                
-            # Add additional connection parameters
-            for key, value in connection_params.items():
-                connection_string += f"{key}={value};"
-                
-            self.connection = pyodbc.connect(connection_string)
+            pool = self._get_pool()
+            # Waits for a free connection on the event loop; only the login or health check uses a thread
+            self.connection = await pool.acquire_async(self.config.pool_timeout)
         except Exception as e:
             raise ConnectionError(f"Failed to connect to SQL Server: {str(e)}")
     
     async def disconnect(self) -> None:
-        """Disconnect from SQL Server"""
+        """Return the connection to the pool"""
         if self.connection:
-            self.connection.close()
-            self.connection = None
+            connection, self.connection = self.connection, None
+            await asyncio.to_thread(self._get_pool().release, connection)
+    
+    def _get_pool(self) -> ConnectionPool:
+        """Get the process-wide pool for this connector's connection string"""
+        connection_string = self._connection_string()
+        return get_pool(
+            connection_string,
+            lambda: _open_connection(connection_string),
+            min_size=self.config.pool_min_size,
+            max_size=self.config.pool_max_size,
+            idle_timeout=self.config.pool_idle_timeout,
+            health_check=lambda connection: connection.cursor().execute("SELECT 1").fetchone()
+        )
     
-    async def get_schema(self) -> List[SchemaObject]:
-        """Get SQL Server database schema"""
+    def _connection_string(self) -> str:
+        """Build the ODBC connection string from credentials and connection parameters"""
+        credentials = self.config.credentials
+        connection_params = self.config.connection_params
+        
+        connection_string = f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+        connection_string += f"SERVER={credentials.get('server')};"
+        connection_string += f"DATABASE={credentials.get('database')};"
+        
+        # Use trusted connection if no username/password provided
+        if credentials.get('username') and credentials.get('password'):
+            connection_string += f"UID={credentials.get('username')};"
+            connection_string += f"PWD={credentials.get('password')};"
+        else:
+            connection_string += "Trusted_Connection=yes;"
+            
+        # Add additional connection parameters
+        for key, value in connection_params.items():
+            connection_string += f"{key}={value};"
+            
+        return connection_string
+    
+    async def get_schema(self, refresh: bool = False) -> List[SchemaObject]:
+        """Get SQL Server database schema, served from cache while the catalog is unchanged"""
+        snapshot = await self._get_schema_snapshot(refresh)
+        return list(snapshot.objects)
+    
+    async def _get_schema_snapshot(self, refresh: bool = False) -> "SchemaSnapshot":
+        """Return the cached schema, reloading it when sys.objects shows a change"""
         if not self.connection:
             await self.connect()
             
-        schema_objects = []
+        cache_key = self._connection_string()
         cursor = self.connection.cursor()
         
-        # Query for tables and views
-        table_query = """
-        SELECT 
-            t.name AS table_name,
-            CASE 
-                WHEN t.type = 'U' THEN 'table'
-                WHEN t.type = 'V' THEN 'view'
-                ELSE t.type
-            END AS table_type,
-            p.value AS description
-        FROM 
-            sys.tables t
-        LEFT JOIN 
-            sys.extended_properties p ON p.major_id = t.object_id AND p.minor_id = 0 AND p.name = 'MS_Description'
-        UNION
-        SELECT 
-            v.name AS table_name,
-            'view' AS table_type,
-            p.value AS description
-        FROM 
-            sys.views v
-        LEFT JOIN 
-            sys.extended_properties p ON p.major_id = v.object_id AND p.minor_id = 0 AND p.name = 'MS_Description'
-        ORDER BY 
-            table_name
-        """
-        
-        tables = cursor.execute(table_query).fetchall()
-        
-        for table in tables:
-            table_name = table[0]
-            table_type = table[1]
-            description = table[2]
-            
-            # Query for columns
-            column_query = f"""
-            SELECT 
-                c.name AS column_name,
-                t.name AS data_type,
-                c.is_nullable,
-                CASE WHEN pk.column_id IS NOT NULL THEN 1 ELSE 0 END AS is_primary_key,
-                CASE WHEN fk.parent_column_id IS NOT NULL THEN OBJECT_NAME(fk.referenced_object_id) + '.' + COL_NAME(fk.referenced_object_id, fk.referenced_column_id) ELSE NULL END AS foreign_key,
-                c.default_object_id,
-                ep.value AS description
-            FROM 
-                sys.columns c
-            JOIN 
-                sys.types t ON c.user_type_id = t.user_type_id
-            LEFT JOIN 
-                sys.index_columns ic ON ic.object_id = c.object_id AND ic.column_id = c.column_id
-            LEFT JOIN 
-                sys.indexes pk ON pk.object_id = c.object_id AND pk.is_primary_key = 1 AND pk.index_id = ic.index_id
-            LEFT JOIN 
-                sys.foreign_key_columns fk ON fk.parent_object_id = c.object_id AND fk.parent_column_id = c.column_id
-            LEFT JOIN 
-                sys.extended_properties ep ON ep.major_id = c.object_id AND ep.minor_id = c.column_id AND ep.name = 'MS_Description'
-            WHERE 
-                c.object_id = OBJECT_ID(?)
-            ORDER BY 
-                c.column_id
-            """
+        try:
+            # ALTER/CREATE/DROP all move modify_date or the object count
+            version_query = "SELECT COUNT(*), MAX(modify_date) FROM sys.objects WHERE type IN ('U', 'V')"
+            version = tuple(await _cursor_call(cursor, lambda: cursor.execute(version_query).fetchone()))
             
-            columns = cursor.execute(column_query, table_name).fetchall()
-            fields = []
-            
-            for column in columns:
-                column_name = column[0]
-                data_type = column[1]
-                is_nullable = column[2]
-                is_primary_key = column[3]
-                foreign_key = column[4]
-                default_value = column[5]
-                description = column[6]
+            cached = _schema_cache.get(cache_key)
+            if cached and cached.version == version and not refresh:
+                return cached
                 
-                fields.append(SchemaField(
-                    name=column_name,
-                    data_type=data_type,
-                    nullable=is_nullable,
-                    primary_key=is_primary_key == 1,
-                    foreign_key=foreign_key,
-                    default_value=default_value,
-                    description=description
-                ))
+            # Two set-based catalog queries for the whole database, joined client-side
+            tables = await _cursor_call(cursor, lambda: cursor.execute(SCHEMA_OBJECTS_QUERY).fetchall())
+            columns = await _cursor_call(cursor, lambda: cursor.execute(SCHEMA_COLUMNS_QUERY).fetchall())
+        finally:
+            cursor.close()
             
+        fields_by_object = {}
+        for column in columns:
+            fields_by_object.setdefault(column[0], []).append(SchemaField(
+                name=column[1],
+                data_type=column[2],
+                nullable=column[3],
+                primary_key=column[4] == 1,
+                foreign_key=column[5],
+                default_value=column[6],
+                description=column[7]
+            ))
+            
+        schema_objects = []
+        schema_names = []
+        for object_id, table_name, schema_name, table_type, description in tables:
             schema_objects.append(SchemaObject(
                 name=table_name,
                 type=table_type,
-                fields=fields,
+                fields=fields_by_object.get(object_id, []),
                 description=description
             ))
+            schema_names.append(schema_name)
+            
+        snapshot = SchemaSnapshot(version, schema_objects, schema_names)
+        _schema_cache[cache_key] = snapshot
+        return snapshot
+    
+    async def list_objects(self, name_filter: Optional[str] = None, schema_filter: Optional[str] = None,
+                           object_type: Optional[str] = None, offset: int = 0,
+                           limit: Optional[int] = None) -> Tuple[int, List[Tuple[str, SchemaObject]]]:
+        """Find tables and views; returns (total matches, requested page of (schema name, object)).
         
-        cursor.close()
-        return schema_objects
+        name_filter is a case-insensitive substring match, schema_filter an exact schema name.
+        """
+        snapshot = await self._get_schema_snapshot()
+        name_filter = name_filter.lower() if name_filter else None
+        schema_filter = schema_filter.lower() if schema_filter else None
+        
+        matches = [
+            (schema_name, obj) for schema_name, obj in zip(snapshot.schema_names, snapshot.objects)
+            if (not name_filter or name_filter in obj.name.lower())
+            and (not schema_filter or (schema_name or "").lower() == schema_filter)
+            and (not object_type or obj.type == object_type)
+        ]
+        page = matches[offset:offset + limit] if limit is not None else matches[offset:]
+        return len(matches), page
+    
+    async def get_object_schema(self, object_name: str) -> Optional[SchemaObject]:
+        """Get one table or view with its columns by name or schema-qualified name (dbo.Orders).
+        
+        A bare name shared by tables in several schemas resolves to the one in dbo, if any.
+        """
+        snapshot = await self._get_schema_snapshot()
+        entries = list(zip(snapshot.schema_names, snapshot.objects))
+        matches = [(schema, obj) for schema, obj in entries if obj.name == object_name]
+        if not matches and "." in object_name:
+            schema_name, name = (part.strip("[]") for part in object_name.rsplit(".", 1))
+            matches = [(schema, obj) for schema, obj in entries
+                       if obj.name == name and (schema or "").lower() == schema_name.lower()]
+        if len(matches) > 1:
+            matches = [(schema, obj) for schema, obj in matches if schema == "dbo"] or matches
+        return matches[0][1] if matches else None
     
     async def extract_data(self, query: Optional[str] = None, object_name: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Extract data from SQL Server"""
+        results = []
+        
+        # Fetch in arraysize chunks so raw rows are released as their dicts are built
+        async for batch in self.iter_batches(object_name=object_name, query=query, limit=limit):
+            results.extend(batch)
+            
+        return results
+    
+    async def iter_batches(self, object_name: Optional[str] = None, batch_size: BatchSize = None,
+                           query: Optional[str] = None, limit: Optional[int] = None,
+                           compact: bool = False, params: Optional[Sequence[Any]] = None) -> AsyncIterator[Union[List[Dict[str, Any]], RecordBatch]]:
+        """Stream rows in batches of at most batch_size (default fetch_arraysize) records.
+        
+        With compact=True each batch is a columnar RecordBatch with one shared column list
+        instead of one dict per row. batch_size may be a callable, which is asked for the
+        size again before every fetch.
+        """
         if not self.connection:
             await self.connect()
             
+        fixed_size = batch_size or self.config.fetch_arraysize
+        next_batch_size = batch_size if callable(batch_size) else lambda: fixed_size
         cursor = self.connection.cursor()
-        results = []
+        cursor.arraysize = next_batch_size()
         
         try:
-            if query:
-                # Add limit to query if provided
-                if limit and "TOP" not in query.upper():
-                    # Insert TOP clause after SELECT
-                    parts = query.split(' ', 1)
-                    query = f"{parts[0]} TOP {limit} {parts[1]}"
-                    
-                cursor.execute(query)
-            elif object_name:
-                # If just object name is provided, select all fields
-                limit_clause = f"TOP {limit} " if limit else ""
-                query = f"SELECT {limit_clause}* FROM {object_name}"
-                cursor.execute(query)
-            else:
-                raise ValueError("Either query or object_name must be provided")
+            await _cursor_call(cursor, cursor.execute, self._build_select(query, object_name, limit), *(params or []))
             
             # Get column names
             columns = [column[0] for column in cursor.description]
             
-            # Fetch all rows and convert to dictionaries
-            for row in cursor.fetchall():
-                row_dict = {}
-                for i, value in enumerate(row):
-                    row_dict[columns[i]] = value
-                results.append(row_dict)
+            while True:
+                # Fetch in a worker thread so the event loop keeps serving other pipeline stages
+                rows = await _cursor_call(cursor, cursor.fetchmany, next_batch_size())
+                if not rows:
+                    break
+                if compact:
+                    yield RecordBatch.from_rows(columns, rows)
+                else:
+                    yield [dict(zip(columns, row)) for row in rows]
+        finally:
+            cursor.close()
+    
+    async def iter_partitioned_batches(self, object_name: str, batch_size: BatchSize = None,
+                                       partitions: int = 4, compact: bool = False,
+                                       key_column: Optional[str] = None,
+                                       ranges: Optional[List[Tuple[Any, Any]]] = None,
+                                       resume_after: Optional[List[Any]] = None,
+                                       groups: Optional[List[int]] = None) -> AsyncIterator[Union[List[Dict[str, Any]], RecordBatch]]:
+        """Stream a table by reading primary key ranges concurrently over separate connections.
+        
+        Each range is read in key order. Pass ranges to reuse previously computed bounds and
+        resume_after to start each range after a given key. Ranges with the same entry in
+        groups are read one after another over a single connection. Compact batches are
+        tagged with the index of their range. Falls back to a single iter_batches scan when
+        no ranges are given and the table has no single-column primary key.
+        """
+        if key_column is None:
+            key_columns = await self.get_primary_key(object_name)
+            key_column = key_columns[0] if len(key_columns) == 1 else None
+            
+        if key_column is None or (ranges is None and partitions <= 1):
+            async for batch in self.iter_batches(object_name, batch_size, compact=compact):
+                yield batch
+            return
+            
+        if ranges is None:
+            ranges = await self.get_key_ranges(object_name, key_column, partitions)
+        resume_after = resume_after or [None] * len(ranges)
+        groups = groups or list(range(len(ranges)))
+        readers = {}
+        for index, group in enumerate(groups):
+            readers.setdefault(group, []).append(index)
+        queue = asyncio.Queue(maxsize=len(readers) * 2)
+        
+        async def read_ranges(indexes: List[int]) -> None:
+            reader = SQLServerConnector(self.config)
+            try:
+                for index in indexes:
+                    (lower, upper), after = ranges[index], resume_after[index]
+                    query, params = self._build_range_select(object_name, key_column, lower, upper, after)
+                    async for batch in reader.iter_batches(query=query, params=params, batch_size=batch_size, compact=compact):
+                        if compact:
+                            batch.partition = index
+                        await queue.put(batch)
+                await queue.put(None)
+            except Exception as e:
+                # Hand the failure to the consumer so it is raised in the caller
+                await queue.put(e)
+            finally:
+                await reader.disconnect()
+                
+        tasks = [asyncio.ensure_future(read_ranges(indexes)) for indexes in readers.values()]
+        remaining = len(tasks)
+        
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def get_primary_key(self, object_name: str) -> List[str]:
+        """Get the primary key columns of a table in key order"""
+        if not self.connection:
+            await self.connect()
+            
+        pk_query = """
+        SELECT 
+            c.name
+        FROM 
+            sys.indexes i
+        JOIN 
+            sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+        JOIN 
+            sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+        WHERE 
+            i.is_primary_key = 1 AND i.object_id = OBJECT_ID(?)
+        ORDER BY 
+            ic.key_ordinal
+        """
+        
+        cursor = self.connection.cursor()
+        try:
+            rows = await _cursor_call(cursor, lambda: cursor.execute(pk_query, object_name).fetchall())
+            return [row[0] for row in rows]
+        finally:
+            cursor.close()
+    
+    async def estimate_row_count(self, object_name: str) -> Optional[int]:
+        """Estimate a table's row count from partition metadata without scanning it"""
+        if not self.connection:
+            await self.connect()
+            
+        count_query = "SELECT SUM(rows) FROM sys.partitions WHERE object_id = OBJECT_ID(?) AND index_id IN (0, 1)"
+        cursor = self.connection.cursor()
+        try:
+            row = await _cursor_call(cursor, lambda: cursor.execute(count_query, object_name).fetchone())
+            return row[0] if row else None
+        finally:
+            cursor.close()
+    
+    async def get_key_ranges(self, object_name: str, key_column: str, partitions: int,
+                             lower: Any = None, upper: Any = None) -> List[Tuple[Any, Any]]:
+        """Split a key column into half-open [lower, upper) ranges; None means unbounded.
+        
+        Integer keys are split evenly between MIN and MAX. Other keys use NTILE boundaries
+        over the key index so each range holds roughly the same number of rows. Pass lower
+        and upper to split only that part of the key space.
+        """
+        if not self.connection:
+            await self.connect()
+            
+        where_clause, params = self._range_where(key_column, lower, upper)
+        cursor = self.connection.cursor()
+        try:
+            bounds_query = f"SELECT MIN({key_column}), MAX({key_column}) FROM {object_name}{where_clause}"
+            low, high = await _cursor_call(cursor, lambda: cursor.execute(bounds_query, *params).fetchone())
+            if low is None:
+                return [(lower, upper)]
                 
-            return results
+            if isinstance(low, int) and isinstance(high, int):
+                step = -(-(high - low + 1) // partitions)
+                boundaries = [low + step * i for i in range(1, partitions) if low + step * i <= high]
+            else:
+                ntile_query = f"""
+                SELECT MIN(k) FROM (
+                    SELECT {key_column} AS k, NTILE(?) OVER (ORDER BY {key_column}) AS bucket FROM {object_name}{where_clause}
+                ) b
+                GROUP BY bucket
+                ORDER BY 1
+                """
+                rows = await _cursor_call(cursor, lambda: cursor.execute(ntile_query, partitions, *params).fetchall())
+                boundaries = [row[0] for row in rows[1:]]
+        finally:
+            cursor.close()
+            
+        lowers = [lower] + boundaries
+        uppers = boundaries + [upper]
+        return list(zip(lowers, uppers))
+    
+    async def count_rows(self, object_name: str) -> int:
+        """Exact row count of a table"""
+        if not self.connection:
+            await self.connect()
+            
+        cursor = self.connection.cursor()
+        try:
+            row = await _cursor_call(cursor, lambda: cursor.execute(f"SELECT COUNT_BIG(*) FROM {object_name}").fetchone())
+            return row[0]
         finally:
             cursor.close()
     
-    async def load_data(self, target_object: str, data: List[Dict[str, Any]]) -> int:
-        """Load data into SQL Server"""
+    async def range_checksums(self, object_name: str, key_column: str, columns: List[str],
+                              ranges: List[Tuple[Any, Any]]) -> List[Tuple[int, int]]:
+        """Row count and CHECKSUM_AGG(BINARY_CHECKSUM) of columns for each contiguous key range.
+        
+        The ranges must be contiguous and ordered, as returned by get_key_ranges. All of them
+        are aggregated server-side in one scan; only one row per range comes back.
+        """
+        if not self.connection:
+            await self.connect()
+            
+        boundaries = [upper for _, upper in ranges[:-1]]
+        bucket_cases = ' '.join(f"WHEN {key_column} < ? THEN {i}" for i in range(len(boundaries)))
+        bucket_expression = f"CASE {bucket_cases} ELSE {len(boundaries)} END" if boundaries else "0"
+        where_clause, params = self._range_where(key_column, ranges[0][0], ranges[-1][1])
+        checksum_query = f"""
+        SELECT bucket, COUNT_BIG(*), CHECKSUM_AGG(row_checksum) FROM (
+            SELECT {bucket_expression} AS bucket, BINARY_CHECKSUM({', '.join(columns)}) AS row_checksum
+            FROM {object_name}{where_clause}
+        ) b
+        GROUP BY bucket
+        """
+        
+        cursor = self.connection.cursor()
+        try:
+            rows = await _cursor_call(cursor, lambda: cursor.execute(checksum_query, *boundaries, *params).fetchall())
+        finally:
+            cursor.close()
+            
+        results = [(0, 0)] * len(ranges)
+        for bucket, count, checksum in rows:
+            results[bucket] = (count, checksum or 0)
+        return results
+    
+    def _range_where(self, key_column: str, lower: Any, upper: Any, after: Any = None) -> Tuple[str, List[Any]]:
+        """WHERE clause for one [lower, upper) range, optionally starting after a key"""
+        conditions = []
+        params = []
+        if after is not None:
+            conditions.append(f"{key_column} > ?")
+            params.append(after)
+        elif lower is not None:
+            conditions.append(f"{key_column} >= ?")
+            params.append(lower)
+        if upper is not None:
+            conditions.append(f"{key_column} < ?")
+            params.append(upper)
+            
+        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where_clause, params
+    
+    def _build_range_select(self, object_name: str, key_column: str, lower: Any, upper: Any, after: Any = None) -> Tuple[str, List[Any]]:
+        """Build a keyset query for one [lower, upper) range, optionally starting after a key"""
+        where_clause, params = self._range_where(key_column, lower, upper, after)
+        return f"SELECT * FROM {object_name}{where_clause} ORDER BY {key_column}", params
+    
+    def _build_select(self, query: Optional[str], object_name: Optional[str], limit: Optional[int]) -> str:
+        """Build the extraction query from a raw query or an object name"""
+        if query:
+            # Add limit to query if provided
+            if limit and "TOP" not in query.upper():
+                # Insert TOP clause after SELECT
+                parts = query.split(' ', 1)
+                query = f"{parts[0]} TOP {limit} {parts[1]}"
+            return query
+        elif object_name:
+            # If just object name is provided, select all fields
+            limit_clause = f"TOP {limit} " if limit else ""
+            return f"SELECT {limit_clause}* FROM {object_name}"
+        else:
+            raise ValueError("Either query or object_name must be provided")
+    
+    async def get_change_version(self, object_name: str, watermark_column: Optional[str] = None,
+                                 change_tracking: bool = False) -> Any:
+        """Get the current high-water mark: MAX(watermark_column) or the change tracking version"""
+        if not self.connection:
+            await self.connect()
+            
+        if change_tracking:
+            version_query = "SELECT CHANGE_TRACKING_CURRENT_VERSION()"
+        elif watermark_column:
+            version_query = f"SELECT MAX({watermark_column}) FROM {object_name}"
+        else:
+            raise ValueError("Either watermark_column or change_tracking must be provided")
+            
+        cursor = self.connection.cursor()
+        try:
+            row = await _cursor_call(cursor, lambda: cursor.execute(version_query).fetchone())
+            return row[0]
+        finally:
+            cursor.close()
+    
+    async def iter_changed_batches(self, object_name: str, since: Any, until: Any,
+                                   watermark_column: Optional[str] = None, change_tracking: bool = False,
+                                   batch_size: BatchSize = None, compact: bool = False) -> AsyncIterator[Union[List[Dict[str, Any]], RecordBatch]]:
+        """Stream rows changed after since and up to until; a since of None reads everything up to until.
+        
+        With change_tracking the rows come from CHANGETABLE joined back to the table on its
+        primary key; deleted rows are not returned.
+        """
+        if change_tracking and since is not None:
+            key_columns = await self.get_primary_key(object_name)
+            if not key_columns:
+                raise ValueError(f"Change tracking requires a primary key on {object_name}")
+            join_clause = ' AND '.join(f"t.{column} = ct.{column}" for column in key_columns)
+            query = f"""
+            SELECT t.* FROM CHANGETABLE(CHANGES {object_name}, ?) AS ct
+            JOIN {object_name} AS t ON {join_clause}
+            WHERE ct.SYS_CHANGE_VERSION <= ? AND ct.SYS_CHANGE_OPERATION <> 'D'
+            """
+            params = [since, until]
+        elif change_tracking:
+            query = f"SELECT * FROM {object_name}"
+            params = []
+        else:
+            conditions = [f"{watermark_column} <= ?"]
+            params = [until]
+            if since is not None:
+                conditions.insert(0, f"{watermark_column} > ?")
+                params.insert(0, since)
+            query = f"SELECT * FROM {object_name} WHERE {' AND '.join(conditions)}"
+            
+        async for batch in self.iter_batches(query=query, params=params, batch_size=batch_size, compact=compact):
+            yield batch
+    
+    async def load_data(self, target_object: str, data: Union[List[Dict[str, Any]], RecordBatch],
+                        mode: str = "insert", key_columns: Optional[List[str]] = None,
+                        rejects: Optional[List[Tuple[Dict[str, Any], str]]] = None) -> int:
+        """Load data into SQL Server; mode "merge" upserts on key_columns.
+        
+        When a rejects list is given, rows failing on bad data are appended to it as
+        (record, error) instead of failing the load, and the remaining rows are committed.
+        """
         if not self.connection:
             await self.connect()
             
         if not data:
             return 0
             
+        # pyodbc blocks, so run the inserts in a worker thread
+        return await asyncio.to_thread(self._load_rows, target_object, as_record_batch(data), mode, key_columns, rejects)
+    
+    def _load_rows(self, target_object: str, batch: RecordBatch, mode: str = "insert",
+                   key_columns: Optional[List[str]] = None,
+                   rejects: Optional[List[Tuple[Dict[str, Any], str]]] = None) -> int:
+        """Insert or merge a batch and commit, rolling back the uncommitted chunk on error"""
         cursor = self.connection.cursor()
         success_count = 0
+        insert_target = target_object
         
         try:
-            # Get column names from the first record
-            columns = list(data[0].keys())
-            
-            # Prepare SQL statement for insert
-            placeholders = '?' * len(columns)
-            placeholder_str = f"({', '.join(placeholders)})"
-            insert_sql = f"INSERT INTO {target_object} ({', '.join(columns)}) VALUES {placeholder_str}"
-            
-            # Execute inserts in batches
-            for record in data:
-                values = [record[column] for column in columns]
-                cursor.execute(insert_sql, values)
-                success_count += 1
+            columns = batch.columns
+            rows = list(batch.rows())
+            
+            if mode == "merge":
+                if not key_columns:
+                    raise ValueError("Merge loads require key_columns")
+                # Rows are bulk inserted into a session temp table, then merged set-based.
+                # The UNION ALL keeps SELECT INTO from copying an IDENTITY property.
+                insert_target = "#merge_stage"
+                column_list = ', '.join(columns)
+                cursor.execute(
+                    f"SELECT TOP 0 {column_list} INTO {insert_target} FROM {target_object} "
+                    f"UNION ALL SELECT TOP 0 {column_list} FROM {target_object}"
+                )
+                # Commit the temp table so rolling back a failed chunk does not drop it
+                self.connection.commit()
+            elif mode != "insert":
+                raise ValueError(f"Unknown load mode: {mode}")
+            
+            commit_interval = self.config.commit_interval or len(rows)
+            for start in range(0, len(rows), commit_interval):
+                chunk = rows[start:start + commit_interval]
+                
+                if rejects is not None:
+                    success_count += self._write_isolating(cursor, target_object, insert_target, columns, chunk,
+                                                           mode, key_columns, rejects)
+                    continue
+                
+                self._write_chunk(cursor, target_object, insert_target, columns, chunk, mode, key_columns)
+                # Commit each chunk so a large load is not one giant transaction
+                self.connection.commit()
+                success_count += len(chunk)
                 
-            # Commit the transaction
-            self.connection.commit()
             return success_count
         except Exception as e:
             # Rollback on error
             self.connection.rollback()
             raise e
         finally:
+            if mode == "merge":
+                cursor.execute(f"IF OBJECT_ID('tempdb..{insert_target}') IS NOT NULL DROP TABLE {insert_target}")
+                self.connection.commit()
             cursor.close()
+    
+    def _write_chunk(self, cursor: Any, target_object: str, insert_target: str, columns: List[str],
+                     chunk: List[tuple], mode: str, key_columns: Optional[List[str]]) -> None:
+        """Send one chunk of rows with the configured load method, without committing"""
+        column_list = ', '.join(columns)
+        if self.config.load_method == "executemany":
+            self._insert_executemany(cursor, insert_target, column_list, len(columns), chunk)
+        elif self.config.load_method == "values":
+            self._insert_values(cursor, insert_target, column_list, len(columns), chunk)
+        elif self.config.load_method == "row":
+            self._insert_row_by_row(cursor, insert_target, column_list, len(columns), chunk)
+        else:
+            raise ValueError(f"Unknown load method: {self.config.load_method}")
+        
+        if mode == "merge":
+            cursor.execute(self._build_merge(target_object, insert_target, columns, key_columns))
+            cursor.execute(f"TRUNCATE TABLE {insert_target}")
+    
+    def _write_isolating(self, cursor: Any, target_object: str, insert_target: str, columns: List[str],
+                         chunk: List[tuple], mode: str, key_columns: Optional[List[str]],
+                         rejects: List[Tuple[Dict[str, Any], str]]) -> int:
+        """Write a chunk, bisecting it on data errors until each failing row is isolated.
+        
+        A clean chunk costs the same single bulk write as a normal load; k bad rows cost
+        about k * log2(chunk size) extra writes. Errors other than data and constraint
+        errors, such as a lost connection, are raised as usual.
+        """
+        success_count = 0
+        pending = [chunk]
+        while pending:
+            rows = pending.pop()
+            try:
+                self._write_chunk(cursor, target_object, insert_target, columns, rows, mode, key_columns)
+                self.connection.commit()
+                success_count += len(rows)
+            except (pyodbc.DataError, pyodbc.IntegrityError) as e:
+                self.connection.rollback()
+                if len(rows) == 1:
+                    rejects.append((dict(zip(columns, rows[0])), str(e)))
+                    continue
+                middle = len(rows) // 2
+                # The second half goes on the stack first so rows are retried in order
+                pending.append(rows[middle:])
+                pending.append(rows[:middle])
+        return success_count
+    
+    def _build_merge(self, target_object: str, stage_table: str, columns: List[str], key_columns: List[str]) -> str:
+        """Build a MERGE that updates matched keys and inserts the rest"""
+        on_clause = ' AND '.join(f"t.{column} = s.{column}" for column in key_columns)
+        update_columns = [column for column in columns if column not in key_columns]
+        merge_sql = f"MERGE {target_object} WITH (HOLDLOCK) AS t USING {stage_table} AS s ON {on_clause} "
+        if update_columns:
+            merge_sql += f"WHEN MATCHED THEN UPDATE SET {', '.join(f't.{column} = s.{column}' for column in update_columns)} "
+        merge_sql += (
+            f"WHEN NOT MATCHED BY TARGET THEN INSERT ({', '.join(columns)}) "
+            f"VALUES ({', '.join(f's.{column}' for column in columns)});"
+        )
+        return merge_sql
+    
+    def _insert_executemany(self, cursor: Any, target_object: str, column_list: str, column_count: int, rows: List[tuple]) -> None:
+        """Send all rows as one parameter array"""
+        placeholder_str = f"({', '.join('?' * column_count)})"
+        cursor.fast_executemany = True
+        cursor.executemany(f"INSERT INTO {target_object} ({column_list}) VALUES {placeholder_str}", rows)
+    
+    def _insert_values(self, cursor: Any, target_object: str, column_list: str, column_count: int, rows: List[tuple]) -> None:
+        """Insert rows with multi-row VALUES statements within SQL Server's parameter limits"""
+        placeholder_str = f"({', '.join('?' * column_count)})"
+        rows_per_statement = max(min(MAX_VALUES_ROWS, (MAX_PARAMETERS - 1) // column_count), 1)
+        
+        for start in range(0, len(rows), rows_per_statement):
+            chunk = rows[start:start + rows_per_statement]
+            values_str = ', '.join([placeholder_str] * len(chunk))
+            params = [value for row in chunk for value in row]
+            cursor.execute(f"INSERT INTO {target_object} ({column_list}) VALUES {values_str}", params)
+    
+    def _insert_row_by_row(self, cursor: Any, target_object: str, column_list: str, column_count: int, rows: List[tuple]) -> None:
+        """Insert one row per round-trip"""
+        placeholder_str = f"({', '.join('?' * column_count)})"
+        insert_sql = f"INSERT INTO {target_object} ({column_list}) VALUES {placeholder_str}"
+        for row in rows:
+            cursor.execute(insert_sql, row)
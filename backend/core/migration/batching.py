@@ -0,0 +1,153 @@
+import os
+import statistics
+import sys
+from typing import Dict, List, Any, Optional
+from ..connectors.record_batch import RecordBatch
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def process_memory_bytes() -> Optional[int]:
+    """Resident set size of this process, or None when it cannot be read"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        # Linux without psutil: the second field of statm is resident pages
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def estimate_row_bytes(batch: RecordBatch, sample_rows: int = 32) -> float:
+    """Approximate in-memory size of one row, from a sample of the batch's rows"""
+    row_count = batch.num_rows
+    if row_count == 0:
+        return 0.0
+    step = max(row_count // sample_rows, 1)
+    sampled = range(0, row_count, step)
+    total = 0
+    for values in batch.data:
+        # Each value costs its object plus the list slot pointing at it
+        total += sum(sys.getsizeof(values[i]) + 8 for i in sampled)
+    return total / len(sampled)
+
+class AdaptiveBatchSizer:
+    """Picks the next batch size from observed load throughput, latency and memory.
+
+    The size hill-climbs on rows/sec: it keeps moving in the direction that last improved
+    throughput and turns around when throughput drops. Each size is judged by the median of
+    samples_per_step loads of roughly that size, so batches still queued at an older size
+    and short tail batches do not count towards it. It shrinks regardless when a batch takes
+    longer than max_latency to load, when rows this job has extracted but not yet loaded
+    exceed its memory budget, or when the whole process is above the optional
+    process_memory_limit_bytes (default UNIVERSALMIGRATE_PROCESS_MEMORY_LIMIT_MB). The size
+    never exceeds what in_flight batches of the observed row width fit in the budget.
+    Call the sizer to get the size for the next batch.
+    """
+    def __init__(self,
+                 initial_size: int = 1000,
+                 min_size: int = 100,
+                 max_size: int = 50000,
+                 memory_budget_bytes: int = 512 * 1024 * 1024,
+                 max_latency: float = 10.0,
+                 in_flight: int = 8,
+                 growth: float = 1.5,
+                 samples_per_step: int = 3,
+                 process_memory_limit_bytes: Optional[int] = None):
+        self.min_size = max(min_size, 1)
+        self.max_size = max(max_size, self.min_size)
+        self.memory_budget_bytes = memory_budget_bytes
+        if process_memory_limit_bytes is None and os.environ.get("UNIVERSALMIGRATE_PROCESS_MEMORY_LIMIT_MB"):
+            process_memory_limit_bytes = int(os.environ["UNIVERSALMIGRATE_PROCESS_MEMORY_LIMIT_MB"]) * 1024 * 1024
+        self.process_memory_limit_bytes = process_memory_limit_bytes
+        self.max_latency = max_latency
+        # Batches that can be held at once across queues, the transformer and the loaders
+        self.in_flight = max(in_flight, 1)
+        self.growth = max(growth, 1.1)
+        self.samples_per_step = max(samples_per_step, 1)
+        self.bytes_per_row: Optional[float] = None
+        # Rows extracted and not yet loaded or released
+        self.buffered_rows = 0
+        self.size = self._clamp(initial_size)
+        self.adjustments = 0
+        self._direction = 1
+        self._last_throughput: Optional[float] = None
+        self._samples: List[float] = []
+
+    def __call__(self) -> int:
+        return self.size
+
+    def observe_batch(self, batch: RecordBatch) -> None:
+        """Count an extracted batch as buffered and update the bytes-per-row estimate from it"""
+        if batch.num_rows == 0:
+            return
+        self.buffered_rows += batch.num_rows
+        row_bytes = estimate_row_bytes(batch)
+        if self.bytes_per_row is None:
+            self.bytes_per_row = row_bytes
+        else:
+            # Smooth over batches so one batch of unusually large values does not dominate
+            self.bytes_per_row = 0.8 * self.bytes_per_row + 0.2 * row_bytes
+
+    def release(self, rows: int) -> None:
+        """Stop counting rows that left memory without being loaded, e.g. spilled to a stage"""
+        self.buffered_rows = max(self.buffered_rows - rows, 0)
+
+    def buffered_bytes(self) -> float:
+        """Approximate memory held by rows this job has extracted but not yet loaded"""
+        return self.buffered_rows * (self.bytes_per_row or 0.0)
+
+    def observe_load(self, rows: int, seconds: float) -> None:
+        """Adjust the size after a batch of rows was loaded in seconds"""
+        if rows == 0:
+            return
+        self.release(rows)
+        if self.buffered_bytes() > self.memory_budget_bytes or self._process_over_limit():
+            new_size = self.size // 2
+            self._direction = -1
+        elif seconds > self.max_latency:
+            new_size = int(self.size / self.growth)
+            self._direction = -1
+        else:
+            if abs(rows - self.size) > self.size * 0.1:
+                return
+            self._samples.append(rows / max(seconds, 1e-6))
+            if len(self._samples) < self.samples_per_step:
+                return
+            throughput = statistics.median(self._samples)
+            # Ignore small dips so measurement noise does not flip the direction every step
+            if self._last_throughput is not None and throughput < self._last_throughput * 0.95:
+                self._direction = -self._direction
+            self._last_throughput = throughput
+            new_size = int(self.size * self.growth) if self._direction > 0 else int(self.size / self.growth)
+            if new_size <= self.min_size:
+                # Probe upwards again once the floor is reached
+                self._direction = 1
+
+        new_size = self._clamp(new_size)
+        self._samples = []
+        if new_size != self.size:
+            self.size = new_size
+            self.adjustments += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current size and the measurements behind it"""
+        return {
+            "batch_size": self.size,
+            "bytes_per_row": round(self.bytes_per_row) if self.bytes_per_row is not None else None,
+            "adjustments": self.adjustments
+        }
+
+    def _process_over_limit(self) -> bool:
+        if self.process_memory_limit_bytes is None:
+            return False
+        memory = process_memory_bytes()
+        return memory is not None and memory > self.process_memory_limit_bytes
+
+    def _clamp(self, size: int) -> int:
+        upper = self.max_size
+        if self.bytes_per_row:
+            upper = min(upper, int(self.memory_budget_bytes / (self.bytes_per_row * self.in_flight)))
+        return max(self.min_size, min(size, upper))
@@ -0,0 +1,203 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, datetime, time as time_of_day
+from decimal import Decimal
+from typing import Dict, List, Any, Optional, Tuple
+
+# Key and watermark values JSON has no type for are stored as a one-entry object tagged with
+# their type, e.g. {"datetime": "2024-01-01T00:00:00"}, so they load back as the same type
+# and are bound to queries with their original SQL type rather than as text
+_JSON_TYPES = {
+    "bytes": bytes.fromhex,
+    "decimal": Decimal,
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": time_of_day.fromisoformat,
+    "uuid": uuid.UUID,
+}
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"bytes": bytes(value).hex()}
+    if isinstance(value, Decimal):
+        return {"decimal": str(value)}
+    # datetime is a subclass of date, so it is checked first
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    if isinstance(value, time_of_day):
+        return {"time": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"uuid": str(value)}
+    raise TypeError(f"Cannot checkpoint values of type {type(value).__name__}")
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        tag, value = next(iter(obj.items()))
+        if tag in _JSON_TYPES and isinstance(value, str):
+            return _JSON_TYPES[tag](value)
+    return obj
+
+class CheckpointStore:
+    """Persists migration checkpoints in a local SQLite file"""
+    def __init__(self, path: str = "checkpoints.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints (job_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS sync_watermarks (sync_id TEXT PRIMARY KEY, watermark TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def save(self, job_id: str, state: Dict[str, Any]) -> None:
+        """Write the latest checkpoint for a job"""
+        payload = json.dumps(state, default=_json_default)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (job_id, state, updated_at) VALUES (?, ?, ?)",
+                (job_id, payload, time.time())
+            )
+            self._connection.commit()
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Read the latest checkpoint for a job, if any"""
+        with self._lock:
+            row = self._connection.execute("SELECT state FROM checkpoints WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0], object_hook=_json_object_hook) if row else None
+
+    def delete(self, job_id: str) -> None:
+        """Remove a job's checkpoint"""
+        with self._lock:
+            self._connection.execute("DELETE FROM checkpoints WHERE job_id = ?", (job_id,))
+            self._connection.commit()
+
+    def save_watermark(self, sync_id: str, watermark: Any) -> None:
+        """Record the high-water mark reached by an incremental sync"""
+        payload = json.dumps({"value": watermark}, default=_json_default)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sync_watermarks (sync_id, watermark, updated_at) VALUES (?, ?, ?)",
+                (sync_id, payload, time.time())
+            )
+            self._connection.commit()
+
+    def load_watermark(self, sync_id: str) -> Any:
+        """Read the last high-water mark of an incremental sync; None before the first run"""
+        with self._lock:
+            row = self._connection.execute("SELECT watermark FROM sync_watermarks WHERE sync_id = ?", (sync_id,)).fetchone()
+        if not row:
+            return None
+        stored = json.loads(row[0], object_hook=_json_object_hook)
+        # Watermarks saved before values were wrapped held rowversion bytes at the top level
+        return stored["value"] if isinstance(stored, dict) else stored
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+class CheckpointTracker:
+    """Tracks committed batches per key range and saves a watermark after each commit.
+
+    Batches are numbered per partition in extraction order. Loaders may commit them out of
+    order, so a partition's watermark only advances over a contiguous run of committed
+    batches. Batches committed ahead of the watermark are saved as [first seq, last seq,
+    first key, last key] spans, with batches of consecutive seqs merged into one span, and
+    resume() reads only the gaps around those spans, so no committed row is loaded twice.
+    """
+    def __init__(self, store: CheckpointStore, job_id: str, state: Dict[str, Any]):
+        self.store = store
+        self.job_id = job_id
+        self.state = state
+        self._next_seq = [0] * len(state["partitions"])
+        # seq -> (first key, last key) of batches committed ahead of each watermark
+        self._pending: List[Dict[int, Tuple[Any, Any]]] = [{} for _ in state["partitions"]]
+
+    @classmethod
+    def start(cls, store: CheckpointStore, job_id: str, source_object: str, target_object: str,
+              key_column: str, ranges: List[Tuple[Any, Any]]) -> "CheckpointTracker":
+        """Create a tracker for a fresh run over the given key ranges"""
+        state = {
+            "source_object": source_object,
+            "target_object": target_object,
+            "key_column": key_column,
+            "partitions": [{"lower": lower, "upper": upper, "after": None, "committed_ahead": [], "group": index}
+                           for index, (lower, upper) in enumerate(ranges)],
+            "processed_records": 0,
+            "success_count": 0,
+            "batches_committed": 0,
+            "status": "running"
+        }
+        tracker = cls(store, job_id, state)
+        tracker.save()
+        return tracker
+
+    @classmethod
+    def resume(cls, store: CheckpointStore, job_id: str, state: Dict[str, Any]) -> "CheckpointTracker":
+        """Continue a saved run over the rows not yet committed.
+
+        Each partition is split into the gaps between its watermark and the batches that
+        were committed ahead of it: after the watermark up to the first such batch, after
+        each span up to the next, and after the last one up to the partition's end. The gaps
+        keep the group of the partition they came from, so they are read one after another
+        and a resumed run opens no more readers than the original one.
+        """
+        partitions = []
+        for index, entry in enumerate(state["partitions"]):
+            lower, after, group = entry["lower"], entry["after"], entry.get("group", index)
+            for *_, first_key, last_key in entry.get("committed_ahead", []):
+                partitions.append({"lower": lower, "upper": first_key, "after": after, "committed_ahead": [], "group": group})
+                lower, after = last_key, last_key
+            partitions.append({"lower": lower, "upper": entry["upper"], "after": after, "committed_ahead": [], "group": group})
+        state["partitions"] = partitions
+        tracker = cls(store, job_id, state)
+        tracker.save()
+        return tracker
+
+    @property
+    def ranges(self) -> List[Tuple[Any, Any]]:
+        return [(p["lower"], p["upper"]) for p in self.state["partitions"]]
+
+    @property
+    def resume_after(self) -> List[Any]:
+        return [p["after"] for p in self.state["partitions"]]
+
+    @property
+    def groups(self) -> List[int]:
+        return [p.get("group", index) for index, p in enumerate(self.state["partitions"])]
+
+    def commit(self, partition: int, seq: int, first_key: Any, last_key: Any, processed: int, succeeded: int) -> None:
+        """Record a committed batch spanning [first_key, last_key] and persist the checkpoint"""
+        self.state["processed_records"] += processed
+        self.state["success_count"] += succeeded
+        self.state["batches_committed"] += 1
+
+        entry = self.state["partitions"][partition]
+        pending = self._pending[partition]
+        pending[seq] = (first_key, last_key)
+        while self._next_seq[partition] in pending:
+            _, entry["after"] = pending.pop(self._next_seq[partition])
+            self._next_seq[partition] += 1
+        spans = []
+        for ahead in sorted(pending):
+            if spans and spans[-1][1] == ahead - 1:
+                # Consecutive batches are adjacent in key order, so one span covers both
+                spans[-1][1], spans[-1][3] = ahead, pending[ahead][1]
+            else:
+                spans.append([ahead, ahead, *pending[ahead]])
+        entry["committed_ahead"] = spans
+
+        self.save()
+
+    def finish(self, status: str) -> None:
+        self.state["status"] = status
+        self.save()
+
+    def save(self) -> None:
+        self.store.save(self.job_id, self.state)
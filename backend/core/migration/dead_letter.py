@@ -0,0 +1,35 @@
+import json
+import os
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+class DeadLetterWriter:
+    """Appends rows rejected by the target to a JSON Lines file, one row with its error per line.
+
+    The file is created on the first rejected row, so clean jobs leave nothing behind.
+    Values JSON cannot represent (Decimal, datetime, bytes, ...) are written as strings.
+    """
+    def __init__(self, job_id: str, path: Optional[str] = None):
+        self.job_id = job_id
+        self.path = path or os.path.join(
+            os.environ.get("UNIVERSALMIGRATE_DEAD_LETTER_DIR", "dead_letters"), f"{job_id}.jsonl"
+        )
+        self.count = 0
+
+    def write(self, target_object: str, rejects: List[Tuple[Dict[str, Any], str]]) -> None:
+        if not rejects:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        rejected_at = time.time()
+        with open(self.path, "a") as f:
+            for record, error in rejects:
+                f.write(json.dumps({
+                    "job_id": self.job_id,
+                    "target_object": target_object,
+                    "error": error,
+                    "rejected_at": rejected_at,
+                    "record": record
+                }, default=str) + "\n")
+        self.count += len(rejects)
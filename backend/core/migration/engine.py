@@ -1,12 +1,40 @@
-from typing import Dict, List, Any, Optional
+import asyncio
+import time
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
 from ..connectors.base import BaseConnector, SchemaObject, SchemaField
+from ..connectors.record_batch import RecordBatch, as_record_batch
+from .transforms import TransformPlan, compile_mappings
+from .checkpoint import CheckpointStore, CheckpointTracker
+from .progress import ProgressTracker
+from .instrumentation import Instrumentation, JobProfiler, metrics
+from .batching import AdaptiveBatchSizer
+from .project import ProjectPlan, foreign_key_dependencies
+from .staging import StagingArea
+from .validation import MigrationValidator, VALIDATION_METHODS
+from .dead_letter import DeadLetterWriter
+from .type_mapping import column_types, compile_type_converters
 
 class MappingDefinition:
     """Defines mapping between source and target fields"""
-    def __init__(self, source_field: str, target_field: str, transformation: Optional[str] = None):
+    def __init__(self, source_field: str, target_field: str, transformation: Optional[str] = None,
+                 transformation_args: Optional[Dict[str, Any]] = None):
         self.source_field = source_field
         self.target_field = target_field
         self.transformation = transformation
+        # Keyword arguments for the registered transformation, e.g. {"type": "int"} for cast
+        self.transformation_args = transformation_args
+
+# Credential fields left out of a connection's identity
+SECRET_CREDENTIALS = ("password", "secret", "token", "key")
+
+def connection_identity(connector: BaseConnector) -> str:
+    """Where a connector points, e.g. SQLServerConnector(database=Sales,server=db1), without its secrets"""
+    credentials = getattr(getattr(connector, "config", None), "credentials", None) or {}
+    fields = ",".join(
+        f"{name}={value}" for name, value in sorted(credentials.items())
+        if value is not None and not any(secret in name.lower() for secret in SECRET_CREDENTIALS)
+    )
+    return f"{type(connector).__name__}({fields})"
 
 class MigrationConfig:
     """Configuration for a migration job"""
@@ -16,107 +44,877 @@ class MigrationConfig:
                  source_object: str,
                  target_object: str,
                  field_mappings: List[MappingDefinition],
-                 batch_size: int = 1000):
+                 batch_size: int = 1000,
+                 queue_depth: int = 4,
+                 loader_workers: int = 1,
+                 extract_partitions: int = 1,
+                 job_id: Optional[str] = None,
+                 checkpoint_store: Optional[CheckpointStore] = None,
+                 checkpoint_key: Optional[str] = None,
+                 sync_mode: str = "full",
+                 watermark_column: Optional[str] = None,
+                 change_tracking: bool = False,
+                 merge_keys: Optional[List[str]] = None,
+                 sync_id: Optional[str] = None,
+                 progress: Optional[ProgressTracker] = None,
+                 profile: bool = False,
+                 adaptive_batching: bool = False,
+                 min_batch_size: int = 100,
+                 max_batch_size: int = 50000,
+                 memory_budget_mb: int = 512,
+                 staging: bool = False,
+                 stage_id: Optional[str] = None,
+                 keep_stage: bool = False,
+                 error_mode: str = "abort",
+                 dead_letter_path: Optional[str] = None,
+                 max_errors: Optional[int] = None,
+                 convert_types: bool = True):
         self.source_connector = source_connector
         self.target_connector = target_connector
         self.source_object = source_object
         self.target_object = target_object
         self.field_mappings = field_mappings
         self.batch_size = batch_size
+        # Maximum number of batches buffered between pipeline stages
+        self.queue_depth = queue_depth
+        # Number of concurrent load workers, each with its own target connection
+        self.loader_workers = loader_workers
+        # Number of key ranges read concurrently from the source, when the connector supports it
+        self.extract_partitions = extract_partitions
+        # Checkpointing: committed-batch watermarks are saved under job_id so a failed job can resume
+        self.job_id = job_id
+        self.checkpoint_store = checkpoint_store
+        # Ordered key used as the watermark; defaults to the source table's primary key
+        self.checkpoint_key = checkpoint_key
+        # "full" copies everything; "incremental" reads rows changed since the last run and merges them
+        self.sync_mode = sync_mode
+        # High-water mark source for incremental runs: a rowversion/modified column or change tracking
+        self.watermark_column = watermark_column
+        self.change_tracking = change_tracking
+        # Target columns matched by the MERGE; defaults to the source primary key mapped to the target
+        self.merge_keys = merge_keys
+        # Key under which the high-water mark is stored between runs. The default names both
+        # connections, so the same tables synced between other servers keep their own mark.
+        self.sync_id = sync_id or (f"{connection_identity(source_connector)}/{source_object}->"
+                                   f"{connection_identity(target_connector)}/{target_object}")
+        # Receives per-batch stage counts while the job runs
+        self.progress = progress
+        # Capture cProfile and tracemalloc output for this job
+        self.profile = profile
+        # Adaptive batching starts at batch_size and resizes batches within [min_batch_size, max_batch_size]
+        # from load latency and row width, keeping buffered batches within memory_budget_mb
+        self.adaptive_batching = adaptive_batching
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.memory_budget_mb = memory_budget_mb
+        # Staging extracts everything to local files first, releases the source, then loads from
+        # the files. An existing complete stage_id is loaded without touching the source, so one
+        # extract can be replayed into several targets; keep_stage keeps the files after success.
+        self.staging = staging
+        self.stage_id = stage_id
+        self.keep_stage = keep_stage
+        # "abort" fails the job on the first load error. "isolate" writes rows the target rejects
+        # to a dead-letter file (dead_letter_path, default dead_letters/<job_id>.jsonl) and keeps
+        # going; targets that cannot isolate rows reject the whole failed batch. The job fails
+        # once more than max_errors rows are rejected.
+        self.error_mode = error_mode
+        self.dead_letter_path = dead_letter_path
+        self.max_errors = max_errors
+        # Convert values of untransformed mappings whose source and target column types differ
+        # (e.g. Decimal into float, datetimeoffset into datetime2), using both connectors' schemas
+        self.convert_types = convert_types
 
 class MigrationEngine:
     """Core engine for executing migrations"""
+    def __init__(self, instrumentation: Optional[Instrumentation] = None):
+        # Stage timings and counters go to the process-wide registry unless replaced
+        self.instrumentation = instrumentation or metrics
+    
+    async def migrate(self, config: MigrationConfig, resume: bool = False) -> Dict[str, Any]:
+        """Execute a migration job, or continue it from its last checkpoint when resume is set"""
+        profiler = None
+        profile_note = None
+        if config.profile:
+            profiler = JobProfiler(config.job_id or f"job-{int(time.time())}")
+            if not profiler.start():
+                profiler = None
+                profile_note = "skipped: another job is being profiled"
+        
+        try:
+            result = await self._run_migration(config, resume)
+        finally:
+            if profiler:
+                profile_note = profiler.stop()
+        
+        if profile_note:
+            result["profile"] = profile_note
+        self.instrumentation.increment("jobs", status=result["status"])
+        return result
     
-    async def migrate(self, config: MigrationConfig) -> Dict[str, Any]:
-        """Execute a migration job"""
+    async def _run_migration(self, config: MigrationConfig, resume: bool) -> Dict[str, Any]:
+        """Run the extract, transform and load pipeline for one job"""
+        # Each loader worker gets its own target connector; the first reuses the configured one
+        loaders = [config.target_connector] + [
+            self._clone_connector(config.target_connector)
+            for _ in range(max(config.loader_workers, 1) - 1)
+        ]
+        
         # Connect to source and target
-        await config.source_connector.connect()
-        await config.target_connector.connect()
+        connected = []
+        try:
+            stage = StagingArea(config.stage_id or config.job_id or f"stage-{int(time.time())}") if config.staging else None
+            # Loading a complete stage again needs no source connection at all
+            replay = stage is not None and stage.complete
+            source_open = not replay
+            for connector in ([config.source_connector] if source_open else []) + loaders:
+                with self._connector_timer(connector, "connect"):
+                    await connector.connect()
+                connected.append(connector)
+        except Exception as e:
+            # Give back the connections already checked out, then fail the job like any other error
+            for connector in connected:
+                with self._connector_timer(connector, "disconnect"):
+                    await connector.disconnect()
+            if config.progress:
+                config.progress.finish("failed")
+            return {"status": "failed", "error": str(e)}
         
+        tracker = None
+        dead_letters = None
         try:
-            # Extract data from source
-            source_data = await config.source_connector.extract_data(object_name=config.source_object)
+            if config.error_mode not in ("abort", "isolate"):
+                raise ValueError(f"Unknown error mode: {config.error_mode}")
+            if config.error_mode == "isolate":
+                dead_letters = DeadLetterWriter(config.job_id or f"job-{int(time.time())}", config.dead_letter_path)
+            # Resolve transformations and type conversions once per job rather than per value
+            plan = await self._compile_plan(config, loaders[0], stage, replay)
+            if replay and stage.manifest.get("sync_mode", "full") != "full":
+                raise ValueError("Staged incremental syncs are loaded in the run that extracted them and cannot be replayed")
+            sync = None if replay else await self._start_incremental(config)
+            # Incremental runs are short catch-ups and are not checkpointed
+            if sync is None:
+                tracker = await self._start_checkpoint(config, resume)
+            
+            sizer = self._create_batch_sizer(config)
+            stats = {
+                "total_records": 0,
+                "processed_records": 0,
+                "success_count": 0
+            }
+            if tracker:
+                # Committed work from earlier runs counts towards this one
+                stats["processed_records"] = tracker.state["processed_records"]
+                stats["success_count"] = tracker.state["success_count"]
+                stats["total_records"] = tracker.state["processed_records"]
             
-            # Transform data according to mappings
-            transformed_data = await self._transform_data(source_data, config.field_mappings)
+            # Bounded queues give backpressure: a fast stage waits instead of buffering the table
+            transform_queue = asyncio.Queue(maxsize=max(config.queue_depth, 1))
+            load_queue = asyncio.Queue(maxsize=max(config.queue_depth, 1))
             
-            # Process in batches
-            total_records = len(transformed_data)
-            processed_records = 0
-            success_count = 0
+            if config.progress:
+                config.progress.begin()
+                config.progress.watch_queue("transform", transform_queue)
+                config.progress.watch_queue("load", load_queue)
+                if replay:
+                    config.progress.total_rows = max(stage.manifest["rows"] - stats["processed_records"], 0)
+                elif sync is None and hasattr(config.source_connector, "estimate_row_count"):
+                    estimate = await config.source_connector.estimate_row_count(config.source_object)
+                    if estimate is not None:
+                        config.progress.total_rows = max(estimate - stats["processed_records"], 0)
             
-            for i in range(0, total_records, config.batch_size):
-                batch = transformed_data[i:i+config.batch_size]
-                batch_success = await config.target_connector.load_data(config.target_object, batch)
-                success_count += batch_success
-                processed_records += len(batch)
-                
-            return {
-                "total_records": total_records,
-                "processed_records": processed_records,
-                "success_count": success_count,
-                "error_count": processed_records - success_count,
+            if stage and not replay:
+                if tracker and tracker.state["batches_committed"]:
+                    raise ValueError(f"Stage {stage.stage_id} is missing or incomplete; cannot resume its load")
+                await self._write_stage(config, stage, sync, sizer)
+                # The load reads only the stage, so the source connection goes back now
+                source_open = False
+                with self._connector_timer(config.source_connector, "disconnect"):
+                    await config.source_connector.disconnect()
+            
+            stages = [
+                self._extract_stage(config, transform_queue, stats, tracker, sync, sizer, stage),
+                self._transform_stage(plan, transform_queue, load_queue, len(loaders), config.progress)
+            ] + [self._load_stage(config, loader, load_queue, stats, tracker, sync, sizer, dead_letters)
+                for loader in loaders]
+            await self._run_stages(stages)
+            
+            if tracker:
+                tracker.finish("completed")
+            if config.progress:
+                config.progress.finish("completed")
+            if sync and sync["until"] is not None:
+                # Only advance the high-water mark once every changed row is merged
+                config.checkpoint_store.save_watermark(config.sync_id, sync["until"])
+            if stage and not config.keep_stage:
+                stage.discard()
+            result = {
+                "total_records": stats["total_records"],
+                "processed_records": stats["processed_records"],
+                "success_count": stats["success_count"],
+                "error_count": stats["processed_records"] - stats["success_count"],
                 "status": "completed"
             }
+            if sizer:
+                result["batch_sizing"] = sizer.snapshot()
+            if stage:
+                result["stage"] = {"stage_id": stage.stage_id, "replayed": replay, "kept": config.keep_stage}
+            if dead_letters and dead_letters.count:
+                result["dead_letter"] = {"path": dead_letters.path, "rows": dead_letters.count}
+            return result
         except Exception as e:
-            return {
+            if tracker:
+                tracker.finish("failed")
+            if config.progress:
+                config.progress.finish("failed")
+            result = {
                 "status": "failed",
                 "error": str(e)
             }
+            if dead_letters and dead_letters.count:
+                result["dead_letter"] = {"path": dead_letters.path, "rows": dead_letters.count}
+            return result
         finally:
             # Close connections
-            await config.source_connector.disconnect()
-            await config.target_connector.disconnect()
+            if source_open:
+                with self._connector_timer(config.source_connector, "disconnect"):
+                    await config.source_connector.disconnect()
+            for loader in loaders:
+                with self._connector_timer(loader, "disconnect"):
+                    await loader.disconnect()
+    
+    async def _compile_plan(self, config: MigrationConfig, target: BaseConnector,
+                            stage: Optional[StagingArea] = None, replay: bool = False) -> TransformPlan:
+        """Compile the field mappings with converters for columns whose types differ"""
+        if not config.convert_types:
+            return compile_mappings(config.field_mappings)
+        if replay:
+            # The stage recorded the source's types when it was extracted
+            source_types = stage.manifest.get("column_types", {})
+            source_dialect = stage.manifest.get("source_dialect")
+        else:
+            source_types = await self._column_types(config.source_connector, config.source_object)
+            source_dialect = getattr(config.source_connector.config, "connector_type", None)
+        target_types = await self._column_types(target, config.target_object)
+        converters = compile_type_converters(config.field_mappings, source_types, target_types, source_dialect,
+                                             getattr(target.config, "connector_type", None))
+        return compile_mappings(config.field_mappings, converters)
+    
+    async def _column_types(self, connector: BaseConnector, object_name: str) -> Dict[str, str]:
+        """Column name -> data type from the connector's schema; empty when the object is not listed"""
+        if hasattr(connector, "get_object_schema"):
+            # Resolves schema-qualified names, so dbo.Orders and sales.Orders are told apart
+            with self._connector_timer(connector, "get_object_schema"):
+                schema_object = await connector.get_object_schema(object_name)
+            return {field.name: field.data_type for field in schema_object.fields} if schema_object else {}
+        if not hasattr(connector, "get_schema"):
+            return {}
+        with self._connector_timer(connector, "get_schema"):
+            schema = await connector.get_schema()
+        return column_types(schema, object_name)
     
-    async def _transform_data(self, source_data: List[Dict[str, Any]], mappings: List[MappingDefinition]) -> List[Dict[str, Any]]:
-        """Transform data according to field mappings"""
-        transformed_data = []
+    async def _run_stages(self, stages: List[Any]) -> None:
+        """Run pipeline stages concurrently, cancelling the rest as soon as one fails"""
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _start_incremental(self, config: MigrationConfig) -> Optional[Dict[str, Any]]:
+        """Resolve the change window and merge keys of an incremental run; None for full runs"""
+        if config.sync_mode == "full":
+            return None
+        if config.sync_mode != "incremental":
+            raise ValueError(f"Unknown sync mode: {config.sync_mode}")
+        if config.checkpoint_store is None:
+            raise ValueError("Incremental sync requires a checkpoint store for its high-water mark")
+        if not (config.watermark_column or config.change_tracking):
+            raise ValueError("Incremental sync requires watermark_column or change_tracking")
         
-        for record in source_data:
-            transformed_record = {}
-            
-            for mapping in mappings:
-                if mapping.source_field in record:
-                    value = record[mapping.source_field]
-                    
-                    # Apply transformation if defined
-                    if mapping.transformation:
-                        # For now, we'll use a simple approach for transformations
-                        # In a real implementation, this would be more sophisticated
-                        if mapping.transformation == "upper":
-                            value = str(value).upper() if value is not None else None
-                        elif mapping.transformation == "lower":
-                            value = str(value).lower() if value is not None else None
-                        elif mapping.transformation == "strip":
-                            value = str(value).strip() if value is not None else None
-                    
-                    transformed_record[mapping.target_field] = value
-            
-            transformed_data.append(transformed_record)
+        source = config.source_connector
+        if not hasattr(source, "iter_changed_batches"):
+            raise ValueError("Source connector does not support incremental extraction")
+        if not getattr(config.target_connector, "supports_merge", False):
+            raise ValueError("Target connector does not support merge loads")
+        
+        merge_keys = config.merge_keys
+        if not merge_keys:
+            # Map the source primary key through the field mappings
+            target_fields = {m.source_field: m.target_field for m in config.field_mappings}
+            key_columns = await source.get_primary_key(config.source_object)
+            merge_keys = [target_fields[column] for column in key_columns if column in target_fields]
+            if not merge_keys or len(merge_keys) != len(key_columns):
+                raise ValueError("Incremental sync requires merge_keys or a mapped source primary key")
         
-        return transformed_data
+        # Capture the upper bound first so rows changed during the run are picked up next time
+        until = await source.get_change_version(config.source_object, config.watermark_column, config.change_tracking)
+        return {
+            "since": config.checkpoint_store.load_watermark(config.sync_id),
+            "until": until,
+            "merge_keys": merge_keys
+        }
+    
+    async def _start_checkpoint(self, config: MigrationConfig, resume: bool) -> Optional[CheckpointTracker]:
+        """Load or create the job's checkpoint tracker; None when the job is not checkpointed"""
+        if config.checkpoint_store is None or config.job_id is None:
+            if resume:
+                raise ValueError("Resuming a migration requires a checkpoint store")
+            return None
+        
+        if resume:
+            state = config.checkpoint_store.load(config.job_id)
+            if state is None:
+                raise ValueError(f"No checkpoint found for job {config.job_id}")
+            return CheckpointTracker.resume(config.checkpoint_store, config.job_id, state)
+        
+        if config.staging:
+            # Staged loads checkpoint by frame number (no key column), whatever the source
+            return CheckpointTracker.start(config.checkpoint_store, config.job_id, config.source_object,
+                                           config.target_object, None, [(None, None)])
+        
+        # Watermarks need ordered keyset extraction into RecordBatches
+        source = config.source_connector
+        if not (hasattr(source, "iter_partitioned_batches") and getattr(source, "supports_record_batch", False)):
+            return None
+        
+        key_column = config.checkpoint_key
+        if key_column is None:
+            key_columns = await source.get_primary_key(config.source_object)
+            if len(key_columns) != 1:
+                return None
+            key_column = key_columns[0]
+        
+        if config.extract_partitions > 1:
+            ranges = await source.get_key_ranges(config.source_object, key_column, config.extract_partitions)
+        else:
+            ranges = [(None, None)]
+        
+        return CheckpointTracker.start(config.checkpoint_store, config.job_id, config.source_object,
+                                       config.target_object, key_column, ranges)
+    
+    def _create_batch_sizer(self, config: MigrationConfig) -> Optional[AdaptiveBatchSizer]:
+        """Build the job's adaptive batch sizer; None when batches have a fixed size"""
+        if not config.adaptive_batching:
+            return None
+        max_size = config.max_batch_size
+        if not getattr(config.source_connector, "supports_adaptive_batches", False):
+            # Fixed-size source batches can be split into smaller ones but never grown
+            max_size = min(max_size, config.batch_size)
+        return AdaptiveBatchSizer(
+            initial_size=config.batch_size,
+            min_size=config.min_batch_size,
+            max_size=max_size,
+            memory_budget_bytes=config.memory_budget_mb * 1024 * 1024,
+            # Both queues full, plus the batch in each stage and loader
+            in_flight=2 * max(config.queue_depth, 1) + max(config.loader_workers, 1) + 2
+        )
+    
+    async def _write_stage(self, config: MigrationConfig, stage: StagingArea, sync: Optional[Dict[str, Any]] = None,
+                           sizer: Optional[AdaptiveBatchSizer] = None) -> None:
+        """Extract the whole source into the stage"""
+        writer = stage.writer({
+            "source_object": config.source_object,
+            "sync_mode": config.sync_mode,
+            "source_dialect": getattr(config.source_connector.config, "connector_type", None),
+            "column_types": await self._column_types(config.source_connector, config.source_object) if config.convert_types else {}
+        })
+        complete = False
+        try:
+            async for source_batch in self._iter_source_batches(config, None, sync, sizer):
+                if sizer:
+                    sizer.observe_batch(source_batch)
+                # Compression and the file write happen off the event loop
+                with self.instrumentation.timer("stage", stage="spill"):
+                    await asyncio.to_thread(writer.write, source_batch)
+                if sizer:
+                    sizer.release(len(source_batch))
+                self.instrumentation.increment("rows", len(source_batch), stage="staged")
+                if config.progress:
+                    config.progress.record("staged", len(source_batch))
+            complete = True
+        finally:
+            await asyncio.to_thread(writer.close, complete)
+    
+    def _stage_frame_ranges(self, tracker: Optional[CheckpointTracker]) -> List[Tuple[int, Optional[int]]]:
+        """[start, stop) frame numbers left to load in each checkpoint partition of a staged load"""
+        if not tracker:
+            return [(0, None)]
+        return [
+            (after + 1 if after is not None else lower or 0, upper)
+            for (lower, upper), after in zip(tracker.ranges, tracker.resume_after)
+        ]
+    
+    async def _extract_stage(self, config: MigrationConfig, out_queue: asyncio.Queue, stats: Dict[str, int],
+                             tracker: Optional[CheckpointTracker] = None, sync: Optional[Dict[str, Any]] = None,
+                             sizer: Optional[AdaptiveBatchSizer] = None, stage: Optional[StagingArea] = None) -> None:
+        """Read source batches into the transform queue, tagged for checkpointing"""
+        next_seq = {}
+        frame_ranges = self._stage_frame_ranges(tracker) if stage else None
+        started = time.perf_counter()
+        async for source_batch in self._iter_source_batches(config, tracker, sync, sizer, stage):
+            self.instrumentation.observe("stage", time.perf_counter() - started, stage="extract")
+            if sizer:
+                sizer.observe_batch(source_batch)
+            self.instrumentation.increment("rows", len(source_batch), stage="extracted")
+            stats["total_records"] += len(source_batch)
+            if config.progress:
+                config.progress.record("extracted", len(source_batch))
+            tag = None
+            if tracker and len(source_batch):
+                # (partition, sequence within partition, first and last key in the batch)
+                partition = source_batch.partition or 0
+                seq = next_seq.get(partition, 0)
+                next_seq[partition] = seq + 1
+                key_column = tracker.state["key_column"]
+                if key_column:
+                    keys = source_batch.column(key_column)
+                    tag = (partition, seq, keys[0], keys[-1])
+                else:
+                    # Staged loads checkpoint by frame number instead of a key
+                    frame = frame_ranges[partition][0] + seq
+                    tag = (partition, seq, frame, frame)
+            # Time blocked on a full queue means a later stage is the bottleneck
+            with self.instrumentation.timer("queue_wait", stage="extract"):
+                await out_queue.put((tag, source_batch))
+            started = time.perf_counter()
+        await out_queue.put(None)
+    
+    async def _transform_stage(self, plan: TransformPlan, in_queue: asyncio.Queue, out_queue: asyncio.Queue, loader_count: int,
+                               progress: Optional[ProgressTracker] = None) -> None:
+        """Apply field mappings to each batch and hand it to the loaders"""
+        while True:
+            item = await in_queue.get()
+            if item is None:
+                break
+            tag, source_batch = item
+            with self.instrumentation.timer("stage", stage="transform"):
+                batch = await self._transform_data(source_batch, plan)
+            self.instrumentation.increment("rows", len(batch), stage="transformed")
+            if progress:
+                progress.record("transformed", len(batch))
+            with self.instrumentation.timer("queue_wait", stage="transform"):
+                await out_queue.put((tag, batch))
+        
+        # One end-of-stream marker per loader worker
+        for _ in range(loader_count):
+            await out_queue.put(None)
+    
+    async def _load_stage(self, config: MigrationConfig, target: BaseConnector, in_queue: asyncio.Queue, stats: Dict[str, int],
+                          tracker: Optional[CheckpointTracker] = None, sync: Optional[Dict[str, Any]] = None,
+                          sizer: Optional[AdaptiveBatchSizer] = None,
+                          dead_letters: Optional[DeadLetterWriter] = None) -> None:
+        """Write transformed batches to the target and checkpoint each committed batch"""
+        native = getattr(target, "supports_record_batch", False)
+        isolating = dead_letters is not None and getattr(target, "supports_error_isolation", False)
+        load_args = {"mode": "merge", "key_columns": sync["merge_keys"]} if sync else {}
+        while True:
+            item = await in_queue.get()
+            if item is None:
+                break
+            tag, batch = item
+            started = time.perf_counter()
+            cancelled = False
+            with self.instrumentation.timer("stage", stage="load"), self._connector_timer(target, "load_data"):
+                load = asyncio.ensure_future(self._load_batch(config, target, batch, native, isolating, load_args, dead_letters))
+                try:
+                    batch_success, rejects = await asyncio.shield(load)
+                except asyncio.CancelledError:
+                    # A load running in a worker thread commits whether or not this task is
+                    # cancelled, so wait for it and checkpoint what it committed before stopping
+                    cancelled = True
+                    try:
+                        batch_success, rejects = await load
+                    except Exception:
+                        raise asyncio.CancelledError()
+            if sizer:
+                sizer.observe_load(len(batch), time.perf_counter() - started)
+            if rejects:
+                dead_letters.write(config.target_object, rejects)
+                self.instrumentation.increment("rows", len(rejects), stage="rejected")
+            self.instrumentation.increment("rows", batch_success, stage="loaded")
+            stats["success_count"] += batch_success
+            stats["processed_records"] += len(batch)
+            if config.progress:
+                config.progress.record("loaded", len(batch))
+            if tag:
+                tracker.commit(*tag, len(batch), batch_success)
+            if cancelled:
+                raise asyncio.CancelledError()
+            errors = stats["processed_records"] - stats["success_count"]
+            if config.max_errors is not None and errors > config.max_errors:
+                raise ValueError(f"{errors} rows failed to load, more than max_errors ({config.max_errors})")
+    
+    async def _load_batch(self, config: MigrationConfig, target: BaseConnector, batch: RecordBatch, native: bool,
+                          isolating: bool, load_args: Dict[str, Any],
+                          dead_letters: Optional[DeadLetterWriter] = None) -> Tuple[int, Optional[List[Tuple[Dict[str, Any], str]]]]:
+        """Load one batch; returns the rows loaded and, when dead-lettering, the rejected rows"""
+        rejects = [] if dead_letters else None
+        try:
+            if isolating:
+                batch_success = await target.load_data(config.target_object, batch if native else batch.to_records(),
+                                                       rejects=rejects, **load_args)
+            else:
+                batch_success = await target.load_data(config.target_object, batch if native else batch.to_records(), **load_args)
+        except Exception as e:
+            if dead_letters is None or isolating:
+                raise
+            # The target cannot say which rows failed, so the whole batch is rejected
+            batch_success = 0
+            rejects = [(record, str(e)) for record in batch.to_records()]
+        return batch_success, rejects
+    
+    def _connector_timer(self, connector: BaseConnector, call: str) -> Any:
+        """Time one connector call, labelled by connector class"""
+        return self.instrumentation.timer("connector_call", connector=type(connector).__name__, call=call)
+    
+    def _clone_connector(self, connector: BaseConnector) -> BaseConnector:
+        """Create a connector of the same type and config with its own connection"""
+        return type(connector)(connector.config)
+    
+    async def _iter_source_batches(self, config: MigrationConfig, tracker: Optional[CheckpointTracker] = None,
+                                   sync: Optional[Dict[str, Any]] = None,
+                                   sizer: Optional[AdaptiveBatchSizer] = None,
+                                   stage: Optional[StagingArea] = None) -> AsyncIterator[RecordBatch]:
+        """Yield source records as columnar batches, streaming when the connector supports it"""
+        if stage:
+            # Frames are yielded whole so their numbers stay valid checkpoints
+            async for batch in self._read_stage(stage, self._stage_frame_ranges(tracker)):
+                yield batch
+            return
+        
+        source = config.source_connector
+        # Connectors that speak RecordBatch skip the per-row dict form entirely
+        compact = getattr(source, "supports_record_batch", False)
+        # Adaptive connectors ask the sizer before every fetch; other batches are split to size below
+        batch_size = sizer if sizer and getattr(source, "supports_adaptive_batches", False) else config.batch_size
+        
+        if sync:
+            batches = source.iter_changed_batches(config.source_object, sync["since"], sync["until"],
+                                                  config.watermark_column, config.change_tracking,
+                                                  batch_size, compact=compact)
+        elif tracker:
+            # Keyset extraction over the checkpointed ranges, continuing after each watermark;
+            # the gaps of one original partition share a reader
+            groups = tracker.groups
+            batches = source.iter_partitioned_batches(config.source_object, batch_size, len(set(groups)), compact=True,
+                                                      key_column=tracker.state["key_column"], ranges=tracker.ranges,
+                                                      resume_after=tracker.resume_after, groups=groups)
+        elif config.extract_partitions > 1 and hasattr(source, "iter_partitioned_batches"):
+            batches = source.iter_partitioned_batches(config.source_object, batch_size, config.extract_partitions, compact=compact)
+        elif hasattr(source, "iter_batches"):
+            batches = source.iter_batches(config.source_object, batch_size, compact=compact)
+        else:
+            batches = self._extract_all(source, config.source_object)
+        
+        async for batch in batches:
+            batch = as_record_batch(batch)
+            limit = sizer() if sizer else config.batch_size
+            if len(batch) <= limit:
+                yield batch
+                continue
+            for start in range(0, len(batch), limit):
+                yield batch.slice(start, start + limit)
+    
+    async def _read_stage(self, stage: StagingArea, frame_ranges: List[Tuple[int, Optional[int]]]) -> AsyncIterator[RecordBatch]:
+        """Decode the staged frames within frame_ranges in a worker thread, one at a time.
+        
+        Ranges are read in order and each batch's partition is set to the index of its range.
+        """
+        for index, (start, stop) in enumerate(frame_ranges):
+            frames = stage.read(start, stop)
+            try:
+                while True:
+                    batch = await asyncio.to_thread(next, frames, None)
+                    if batch is None:
+                        break
+                    batch.partition = index
+                    yield batch
+            finally:
+                frames.close()
+    
+    async def _extract_all(self, source: BaseConnector, object_name: str) -> AsyncIterator[RecordBatch]:
+        """Connectors without a batch iterator still return the whole object at once"""
+        source_data = await source.extract_data(object_name=object_name)
+        if source_data:
+            yield RecordBatch.from_records(source_data)
+    
+    async def _transform_data(self, source_data: RecordBatch, plan: TransformPlan) -> RecordBatch:
+        """Transform data according to the job's compiled field mappings"""
+        return plan.apply_batch(source_data)
 
 class MigrationScheduler:
     """Schedules and manages migration jobs"""
-    def __init__(self):
+    def __init__(self, checkpoint_path: Optional[str] = None, max_concurrent_jobs: Optional[int] = None):
+        import os
         self.engine = MigrationEngine()
         self.active_jobs = {}
+        self.job_configs = {}
+        self.checkpoint_store = CheckpointStore(
+            checkpoint_path or os.environ.get("UNIVERSALMIGRATE_CHECKPOINT_DB", "checkpoints.db")
+        )
+        # Jobs beyond this limit wait in FIFO order until a running job finishes
+        self.max_concurrent_jobs = max_concurrent_jobs or int(os.environ.get("UNIVERSALMIGRATE_MAX_CONCURRENT_JOBS", "4"))
+        self._job_slots = asyncio.Semaphore(self.max_concurrent_jobs)
+        self._tasks = {}
+        self.job_progress = {}
+        self.projects = {}
+        self._project_tasks = {}
+        self.verifications = {}
+        self._verification_tasks = {}
     
     async def schedule_migration(self, config: MigrationConfig) -> str:
-        """Schedule a new migration job"""
+        """Queue a new migration job and return its id without waiting for it to run"""
         import uuid
         job_id = str(uuid.uuid4())
         
-        # In a real implementation, this would be queued or run in background
-        # For simplicity, we'll run it directly
-        result = await self.engine.migrate(config)
+        # Jobs run concurrently, so each gets its own connectors rather than sharing the
+        # registered ones, whose connection another job would replace or release
+        config.source_connector = self.engine._clone_connector(config.source_connector)
+        config.target_connector = self.engine._clone_connector(config.target_connector)
+        config.job_id = job_id
+        config.checkpoint_store = self.checkpoint_store
+        self.job_configs[job_id] = config
         
-        self.active_jobs[job_id] = result
+        self._start_job(job_id, resume=False)
         return job_id
     
+    async def resume_migration(self, job_id: str) -> bool:
+        """Queue a job to continue from its last checkpoint; False if the job is unknown"""
+        if job_id not in self.job_configs:
+            return False
+        if job_id in self._tasks:
+            raise ValueError(f"Job {job_id} is already queued or running")
+        
+        self._start_job(job_id, resume=True)
+        return True
+    
+    def _start_job(self, job_id: str, resume: bool) -> None:
+        """Run a job as a background task"""
+        self.active_jobs[job_id] = {"status": "queued"}
+        self.job_progress[job_id] = ProgressTracker(job_id)
+        self.job_configs[job_id].progress = self.job_progress[job_id]
+        task = asyncio.ensure_future(self._run_job(job_id, resume))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+    
+    async def _run_job(self, job_id: str, resume: bool) -> None:
+        """Wait for a free slot, then execute the job and record its result"""
+        async with self._job_slots:
+            self.active_jobs[job_id] = {"status": "running"}
+            try:
+                result = await self.engine.migrate(self.job_configs[job_id], resume=resume)
+            except Exception as e:
+                result = {"status": "failed", "error": str(e)}
+                # Event subscribers wait for the end marker, so never leave the tracker running
+                progress = self.job_progress.get(job_id)
+                if progress and progress.status == "running":
+                    progress.finish("failed")
+            self.active_jobs[job_id] = result
+    
     def get_job_status(self, job_id: str) -> Dict[str, Any]:
         """Get the status of a migration job"""
         if job_id in self.active_jobs:
-            return self.active_jobs[job_id]
+            status = self.active_jobs[job_id]
+            if status["status"] == "running":
+                return dict(status, progress=self.job_progress[job_id].snapshot())
+            return status
         else:
             return {"status": "not_found"}
+    
+    def get_job_progress(self, job_id: str) -> Optional[ProgressTracker]:
+        """Get the progress tracker of a job's latest run"""
+        return self.job_progress.get(job_id)
+    
+    async def verify_migration(self, job_id: str, method: str = "auto", partitions: int = 16,
+                               leaf_rows: int = 10000, key_column: Optional[str] = None,
+                               target_key_column: Optional[str] = None) -> bool:
+        """Queue a comparison of a job's source and target; False if the job is unknown.
+        
+        Rows are matched on key_column, else the job's checkpoint key, else the source's
+        single-column primary key. target_key_column defaults to the column key_column is
+        copied into.
+        """
+        if method not in VALIDATION_METHODS:
+            raise ValueError(f"Unknown validation method: {method}")
+        if job_id not in self.job_configs:
+            return False
+        if job_id in self._verification_tasks:
+            raise ValueError(f"Job {job_id} is already being verified")
+        
+        config = self.job_configs[job_id]
+        # Only columns copied unchanged can be compared
+        columns = [(m.source_field, m.target_field) for m in config.field_mappings if not m.transformation]
+        target_fields = dict(columns)
+        key_column = key_column or config.checkpoint_key
+        source = self.engine._clone_connector(config.source_connector)
+        target = self.engine._clone_connector(config.target_connector)
+        try:
+            if key_column is None:
+                key_columns = await source.get_primary_key(config.source_object) if hasattr(source, "get_primary_key") else []
+                if len(key_columns) != 1:
+                    raise ValueError("Verification needs a single-column key on the source object; pass key_column")
+                key_column = key_columns[0]
+            if target_key_column is None:
+                if key_column not in target_fields:
+                    raise ValueError(f"Key column {key_column} is not copied unchanged to the target; pass target_key_column")
+                target_key_column = target_fields[key_column]
+            elif (key_column, target_key_column) not in columns:
+                columns.append((key_column, target_key_column))
+        except Exception:
+            # get_primary_key checks out a connection that no verification will release
+            await source.disconnect()
+            raise
+        
+        validator = MigrationValidator(source, target, config.source_object, config.target_object, columns,
+                                       (key_column, target_key_column), method=method,
+                                       partitions=partitions, leaf_rows=leaf_rows)
+        self.verifications[job_id] = {"status": "running"}
+        task = asyncio.ensure_future(self._run_verification(job_id, validator))
+        self._verification_tasks[job_id] = task
+        task.add_done_callback(lambda _: self._verification_tasks.pop(job_id, None))
+        return True
+    
+    async def _run_verification(self, job_id: str, validator: MigrationValidator) -> None:
+        started = time.monotonic()
+        try:
+            result = await validator.validate()
+        except Exception as e:
+            result = {"status": "error", "error": str(e)}
+        finally:
+            await validator.source.disconnect()
+            await validator.target.disconnect()
+        result["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        self.verifications[job_id] = result
+    
+    def get_verification(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get the latest verification result of a job"""
+        return self.verifications.get(job_id)
+    
+    async def schedule_project(self, configs: List[MigrationConfig], max_parallel_tables: Optional[int] = None) -> str:
+        """Queue a multi-table migration and return its project id.
+        
+        Each table runs as its own job once the tables it references through foreign keys
+        have completed. Ready tables start largest first, at most max_parallel_tables at a
+        time and always within the scheduler's global job limit.
+        """
+        import uuid
+        project_id = str(uuid.uuid4())
+        
+        job_ids = []
+        for config in configs:
+            job_id = str(uuid.uuid4())
+            # Concurrent tables each get their own connectors so they never share a connection
+            planning_source = config.source_connector
+            config.source_connector = self.engine._clone_connector(config.source_connector)
+            config.target_connector = self.engine._clone_connector(config.target_connector)
+            config.job_id = job_id
+            config.checkpoint_store = self.checkpoint_store
+            self.job_configs[job_id] = config
+            self.active_jobs[job_id] = {"status": "pending"}
+            job_ids.append((job_id, planning_source))
+        
+        self.projects[project_id] = {
+            "status": "planning",
+            "job_ids": [job_id for job_id, _ in job_ids],
+            "max_parallel_tables": max_parallel_tables or self.max_concurrent_jobs
+        }
+        task = asyncio.ensure_future(self._run_project(project_id, job_ids))
+        self._project_tasks[project_id] = task
+        task.add_done_callback(lambda _: self._project_tasks.pop(project_id, None))
+        return project_id
+    
+    async def _run_project(self, project_id: str, jobs: List[Any]) -> None:
+        """Start each table's job as soon as its dependencies completed and a slot is free"""
+        project = self.projects[project_id]
+        job_ids = project["job_ids"]
+        try:
+            plan = await self._plan_project(jobs)
+        except Exception as e:
+            for job_id in job_ids:
+                self.active_jobs[job_id] = {"status": "skipped", "error": "Project planning failed"}
+            project.update(status="failed", error=f"Failed to read the source schema: {str(e)}")
+            return
+        
+        project["status"] = "running"
+        project["plan"] = plan
+        running = {}
+        while not plan.done:
+            for index in plan.ready():
+                if len(running) >= project["max_parallel_tables"]:
+                    break
+                running[self._start_project_job(plan, job_ids[index], index)] = index
+            
+            if not running:
+                break
+            
+            finished, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                index = running.pop(task)
+                succeeded = self.active_jobs[job_ids[index]]["status"] == "completed"
+                for skipped in plan.finish(index, succeeded):
+                    self.active_jobs[job_ids[skipped]] = {
+                        "status": "skipped",
+                        "error": f"Depends on failed job {job_ids[index]}"
+                    }
+        
+        project["status"] = "completed" if len(plan.completed) == len(job_ids) else "failed"
+    
+    def _start_project_job(self, plan: ProjectPlan, job_id: str, index: int) -> asyncio.Future:
+        plan.start(index)
+        self._start_job(job_id, resume=False)
+        return self._tasks[job_id]
+    
+    async def _plan_project(self, jobs: List[Any]) -> ProjectPlan:
+        """Build the dependency graph from each source's schema and size the tables"""
+        configs = [self.job_configs[job_id] for job_id, _ in jobs]
+        dependencies = {index: set() for index in range(len(jobs))}
+        sizes = {}
+        
+        # Foreign keys only link tables read through the same source connector
+        groups = {}
+        for index, (_, source) in enumerate(jobs):
+            groups.setdefault(id(source), (source, []))[1].append(index)
+        
+        for planning_source, indexes in groups.values():
+            # A copy with its own connection, so planning never touches a connection in use elsewhere
+            source = self.engine._clone_connector(planning_source)
+            try:
+                schema = await source.get_schema()
+                local = foreign_key_dependencies([configs[i].source_object for i in indexes], schema)
+                for position, parents in local.items():
+                    dependencies[indexes[position]] = {indexes[parent] for parent in parents}
+                if hasattr(source, "estimate_row_count"):
+                    for i in indexes:
+                        sizes[i] = await source.estimate_row_count(configs[i].source_object) or 0
+            finally:
+                await source.disconnect()
+        
+        return ProjectPlan(dependencies, sizes)
+    
+    def get_project_status(self, project_id: str) -> Dict[str, Any]:
+        """Get a project's status with the status of every table job"""
+        if project_id not in self.projects:
+            return {"status": "not_found"}
+        project = self.projects[project_id]
+        plan = project.get("plan")
+        tables = []
+        for index, job_id in enumerate(project["job_ids"]):
+            config = self.job_configs[job_id]
+            tables.append({
+                "job_id": job_id,
+                "source_object": config.source_object,
+                "target_object": config.target_object,
+                "depends_on": [project["job_ids"][parent] for parent in sorted(plan.dependencies[index])] if plan else [],
+                "estimated_rows": plan.sizes.get(index) if plan else None,
+                **self.get_job_status(job_id)
+            })
+        
+        status = {key: value for key, value in project.items() if key not in ("plan", "job_ids")}
+        status["tables"] = tables
+        if plan:
+            # Tables whose foreign keys form a cycle run without ordering between them
+            status["cycles"] = [[project["job_ids"][index] for index in sorted(cycle)] for cycle in plan.cycles]
+        return status
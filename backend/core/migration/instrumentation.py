@@ -0,0 +1,162 @@
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+
+class Instrumentation:
+    """Receives stage timings and counters from the migration engine.
+
+    Subclass and override observe/increment to forward measurements elsewhere; the default
+    implementation discards them.
+    """
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """Record the duration of one operation"""
+        pass
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add to a counter"""
+        pass
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Time the enclosed block, including any awaits inside it"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+class MetricsRegistry(Instrumentation):
+    """Aggregates timings and counters in memory and renders them in Prometheus text format"""
+    def __init__(self, prefix: str = "universalmigrate"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        # (name, labels) -> [count, sum, max]
+        self._timers: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[float]] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            entry = self._timers.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values as plain data"""
+        with self._lock:
+            return {
+                "timers": [
+                    {"name": name, "labels": dict(labels), "count": count, "seconds": total, "max_seconds": peak}
+                    for (name, labels), (count, total, peak) in self._timers.items()
+                ],
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self._counters.items()
+                ]
+            }
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            timers = sorted(self._timers.items())
+            counters = sorted(self._counters.items())
+
+        # Each metric family's samples must be contiguous
+        summaries: Dict[str, List[str]] = {}
+        maxima: Dict[str, List[str]] = {}
+        for (name, labels), (count, total, peak) in timers:
+            metric = f"{self.prefix}_{name}_seconds"
+            label_str = _format_labels(labels)
+            summaries.setdefault(metric, []).extend([
+                f"{metric}_count{label_str} {count}",
+                f"{metric}_sum{label_str} {total:.6f}"
+            ])
+            maxima.setdefault(f"{metric}_max", []).append(f"{metric}_max{label_str} {peak:.6f}")
+
+        totals: Dict[str, List[str]] = {}
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}_{name}_total"
+            totals.setdefault(metric, []).append(f"{metric}{_format_labels(labels)} {value:g}")
+
+        for families, metric_type in ((summaries, "summary"), (maxima, "gauge"), (totals, "counter")):
+            for metric, samples in families.items():
+                lines.append(f"# TYPE {metric} {metric_type}")
+                lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ", ".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels) + "}"
+
+def _escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Process-wide registry used by the engine unless another Instrumentation is supplied
+metrics = MetricsRegistry()
+
+# cProfile can only run one profiler per thread, so jobs take turns
+_profile_lock = threading.Lock()
+
+class JobProfiler:
+    """Opt-in cProfile and tracemalloc capture for one job.
+
+    cProfile sees the event-loop thread only, so with several jobs running at once the
+    profile also includes their work; driver calls in worker threads appear as waits.
+    """
+    def __init__(self, job_id: str, output_dir: Optional[str] = None):
+        self.job_id = job_id
+        self.output_dir = output_dir or os.environ.get("UNIVERSALMIGRATE_PROFILE_DIR", "profiles")
+        self._profile: Optional[cProfile.Profile] = None
+        self._started_tracemalloc = False
+        self.files: Dict[str, str] = {}
+
+    def start(self) -> bool:
+        """Begin profiling; False when another job is already being profiled"""
+        if not _profile_lock.acquire(blocking=False):
+            return False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        return True
+
+    def stop(self) -> Dict[str, str]:
+        """Stop profiling and write the pstats dump and top allocations; returns file paths"""
+        if self._profile is None:
+            return self.files
+        try:
+            self._profile.disable()
+            os.makedirs(self.output_dir, exist_ok=True)
+
+            pstats_path = os.path.join(self.output_dir, f"{self.job_id}.pstats")
+            self._profile.dump_stats(pstats_path)
+            self.files["pstats"] = pstats_path
+
+            memory_path = os.path.join(self.output_dir, f"{self.job_id}.memory.txt")
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            with open(memory_path, "w") as f:
+                f.write(f"current_bytes {current}\npeak_bytes {peak}\n\n")
+                for stat in snapshot.statistics("lineno")[:50]:
+                    f.write(f"{stat}\n")
+            self.files["memory"] = memory_path
+        finally:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            self._profile = None
+            _profile_lock.release()
+        return self.files
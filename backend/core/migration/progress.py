@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import Dict, List, Any, Optional
+
+STAGES = ("staged", "extracted", "transformed", "loaded")
+
+class ProgressTracker:
+    """Collects per-stage row counts for a running job and publishes progress events"""
+    def __init__(self, job_id: Optional[str] = None, total_rows: Optional[int] = None):
+        self.job_id = job_id
+        # Estimated source row count, used for the ETA when known
+        self.total_rows = total_rows
+        self.status = "running"
+        self.counts = {stage: 0 for stage in STAGES}
+        self.started = time.monotonic()
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._subscribers: List[asyncio.Queue] = []
+        self._last_sample = (self.started, dict(self.counts))
+        self._current_rates = {stage: 0.0 for stage in STAGES}
+        self.last_event: Optional[Dict[str, Any]] = None
+
+    def begin(self) -> None:
+        """Start the clock when the job actually starts running, not when it was queued"""
+        self.started = time.monotonic()
+        self._last_sample = (self.started, dict(self.counts))
+
+    def watch_queue(self, name: str, queue: asyncio.Queue) -> None:
+        """Report the depth of a pipeline queue in each event"""
+        self._queues[name] = queue
+
+    def record(self, stage: str, rows: int) -> None:
+        """Count rows that finished a stage and publish an event"""
+        self.counts[stage] += rows
+        self._publish(self.snapshot())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counts, rows/sec per stage, queue depths and ETA"""
+        if self.status != "running" and self.last_event is not None:
+            # A finished job's numbers are frozen at its final event
+            return self.last_event
+
+        now = time.monotonic()
+        elapsed = max(now - self.started, 1e-9)
+
+        # Current rates cover the time since the previous sample, at most once a second
+        sample_time, sample_counts = self._last_sample
+        if now - sample_time >= 1.0:
+            self._current_rates = {
+                stage: (self.counts[stage] - sample_counts[stage]) / (now - sample_time) for stage in STAGES
+            }
+            self._last_sample = (now, dict(self.counts))
+
+        average_rates = {stage: self.counts[stage] / elapsed for stage in STAGES}
+        eta = None
+        if self.total_rows is not None and average_rates["loaded"] > 0:
+            eta = max(self.total_rows - self.counts["loaded"], 0) / average_rates["loaded"]
+
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows": dict(self.counts),
+            "rows_per_second": {stage: round(rate, 1) for stage, rate in average_rates.items()},
+            "current_rows_per_second": {stage: round(rate, 1) for stage, rate in self._current_rates.items()},
+            "queue_depths": {name: queue.qsize() for name, queue in self._queues.items()},
+            "total_rows": self.total_rows,
+            "eta_seconds": round(eta, 1) if eta is not None else None
+        }
+
+    def subscribe(self, max_events: int = 100) -> asyncio.Queue:
+        """Get a queue receiving every event; None marks the end of the job"""
+        queue = asyncio.Queue(maxsize=max_events)
+        if self.last_event is not None:
+            queue.put_nowait(self.last_event)
+        if self.status != "running":
+            queue.put_nowait(None)
+        else:
+            self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def finish(self, status: str) -> None:
+        """Publish the final event and close all subscriptions"""
+        event = self.snapshot()
+        self.status = status
+        event["status"] = status
+        self._publish(event)
+        for queue in self._subscribers:
+            self._offer(queue, None)
+        self._subscribers = []
+
+    def _publish(self, event: Dict[str, Any]) -> None:
+        self.last_event = event
+        for queue in self._subscribers:
+            self._offer(queue, event)
+
+    def _offer(self, queue: asyncio.Queue, event: Optional[Dict[str, Any]]) -> None:
+        """Enqueue without blocking, dropping the oldest event for slow subscribers"""
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
@@ -0,0 +1,112 @@
+from typing import Dict, List, Optional, Set
+from ..connectors.base import SchemaObject
+
+def table_key(name: str) -> str:
+    """Normalise an object name such as [dbo].[Orders] to match foreign key references"""
+    return name.split(".")[-1].strip("[]\"` ").lower()
+
+def foreign_key_dependencies(source_objects: List[str], schema: List[SchemaObject]) -> Dict[int, Set[int]]:
+    """Map each table index to the indexes of the tables it references through foreign keys.
+
+    Foreign keys are read from the source schema as "Table.column". References to tables
+    outside the project and self-references are ignored.
+    """
+    indexes_by_key: Dict[str, List[int]] = {}
+    for index, name in enumerate(source_objects):
+        indexes_by_key.setdefault(table_key(name), []).append(index)
+
+    referenced_by_key: Dict[str, Set[str]] = {}
+    for schema_object in schema:
+        references = referenced_by_key.setdefault(table_key(schema_object.name), set())
+        for field in schema_object.fields:
+            if field.foreign_key:
+                references.add(table_key(field.foreign_key.rsplit(".", 1)[0]))
+
+    dependencies: Dict[int, Set[int]] = {}
+    for index, name in enumerate(source_objects):
+        key = table_key(name)
+        dependencies[index] = {
+            parent
+            for referenced in referenced_by_key.get(key, set()) if referenced != key
+            for parent in indexes_by_key.get(referenced, [])
+        }
+    return dependencies
+
+class ProjectPlan:
+    """Dependency-aware run order for the tables of a project migration.
+
+    A table becomes ready once every table it references has completed; ready tables are
+    handed out largest first so the longest copies start early. When a table fails, the
+    tables depending on it are skipped. Tables that reference each other in a cycle cannot
+    be ordered, so references within a cycle are ignored and its tables run together.
+    """
+    def __init__(self, dependencies: Dict[int, Set[int]], sizes: Optional[Dict[int, int]] = None):
+        self.cycles = find_cycles(dependencies)
+        cycle_of = {index: cycle for cycle in self.cycles for index in cycle}
+        self.dependencies = {
+            index: {parent for parent in parents if parent not in cycle_of.get(index, ())}
+            for index, parents in dependencies.items()
+        }
+        self.sizes = sizes or {}
+        self.pending: Set[int] = set(dependencies)
+        self.running: Set[int] = set()
+        self.completed: Set[int] = set()
+        self.failed: Set[int] = set()
+        self.skipped: Set[int] = set()
+
+    @property
+    def done(self) -> bool:
+        return not self.pending and not self.running
+
+    def ready(self) -> List[int]:
+        """Pending tables whose dependencies have all completed, largest first"""
+        ready = [index for index in self.pending if self.dependencies[index] <= self.completed]
+        return sorted(ready, key=lambda index: (-self.sizes.get(index, 0), index))
+
+    def start(self, index: int) -> None:
+        self.pending.discard(index)
+        self.running.add(index)
+
+    def finish(self, index: int, succeeded: bool) -> List[int]:
+        """Record a finished table; returns the tables skipped because it failed"""
+        self.running.discard(index)
+        if succeeded:
+            self.completed.add(index)
+            return []
+        self.failed.add(index)
+
+        skipped = []
+        blocked = [index]
+        while blocked:
+            parent = blocked.pop()
+            for child in list(self.pending):
+                if parent in self.dependencies[child]:
+                    self.pending.discard(child)
+                    self.skipped.add(child)
+                    skipped.append(child)
+                    blocked.append(child)
+        return skipped
+
+def find_cycles(dependencies: Dict[int, Set[int]]) -> List[Set[int]]:
+    """Groups of two or more tables that reach each other through their references"""
+    reachable: Dict[int, Set[int]] = {}
+    for start in dependencies:
+        seen: Set[int] = set()
+        stack = list(dependencies[start])
+        while stack:
+            index = stack.pop()
+            if index not in seen:
+                seen.add(index)
+                stack.extend(dependencies.get(index, ()))
+        reachable[start] = seen
+
+    cycles: List[Set[int]] = []
+    assigned: Set[int] = set()
+    for index in sorted(dependencies):
+        if index in assigned:
+            continue
+        cycle = {index} | {other for other in reachable[index] if index in reachable.get(other, ())}
+        if len(cycle) > 1:
+            cycles.append(cycle)
+            assigned |= cycle
+    return cycles
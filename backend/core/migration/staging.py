@@ -0,0 +1,186 @@
+import json
+import mmap
+import os
+import pickle
+import re
+import shutil
+import struct
+import time
+import uuid
+import zlib
+from datetime import date, datetime, time as time_of_day
+from decimal import Decimal
+from typing import Dict, Any, Optional, Iterator
+from ..connectors.record_batch import RecordBatch
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Each frame is a little-endian uint32 length followed by that many bytes of zlib data
+FRAME_HEADER = struct.Struct("<I")
+DATA_FILE = "batches.bin"
+MANIFEST_FILE = "manifest.json"
+# Stage ids name a directory directly under the staging root, so no separators or dots
+STAGE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# msgpack extension codes for values it has no native type for
+_EXT_DECIMAL = 1
+_EXT_DATETIME = 2
+_EXT_DATE = 3
+_EXT_TIME = 4
+_EXT_UUID = 5
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    # datetime is a subclass of date, so it is checked first
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    if isinstance(value, time_of_day):
+        return msgpack.ExtType(_EXT_TIME, value.isoformat().encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, value.bytes)
+    raise TypeError(f"Cannot stage values of type {type(value).__name__}")
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_TIME:
+        return time_of_day.fromisoformat(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+def _encode(codec: str, value: Any) -> bytes:
+    if codec == "msgpack":
+        return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _decode(codec: str, payload: bytes) -> Any:
+    if codec == "msgpack":
+        if msgpack is None:
+            raise ImportError("msgpack is required to read this stage")
+        return msgpack.unpackb(payload, ext_hook=_msgpack_ext_hook, raw=False)
+    # Stages are written by this process's own jobs into a local directory
+    return pickle.loads(payload)
+
+def validate_stage_id(stage_id: str) -> str:
+    """Return stage_id if it is a safe directory name, else raise ValueError"""
+    if not isinstance(stage_id, str) or not STAGE_ID_PATTERN.match(stage_id):
+        raise ValueError("Stage ids may only contain letters, digits, '_' and '-'")
+    return stage_id
+
+class StagingArea:
+    """A directory holding one job's extracted batches for loading independently of the source.
+
+    Batches are appended as length-prefixed, zlib-compressed frames encoded with msgpack when
+    it is installed and pickle otherwise. The manifest marks the stage complete once every
+    batch is written; a complete stage can be loaded repeatedly, into any number of targets.
+    """
+    def __init__(self, stage_id: str, root: Optional[str] = None):
+        self.stage_id = validate_stage_id(stage_id)
+        self.root = root or os.environ.get("UNIVERSALMIGRATE_STAGING_DIR", "staging")
+        self.path = os.path.join(self.root, stage_id)
+        # Stages are deleted recursively and unpickled, so never let one resolve outside the root
+        root_path = os.path.realpath(self.root)
+        if os.path.dirname(os.path.realpath(self.path)) != root_path:
+            raise ValueError(f"Stage {stage_id} resolves outside the staging directory")
+
+    @property
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.path, MANIFEST_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @property
+    def complete(self) -> bool:
+        manifest = self.manifest
+        return bool(manifest and manifest.get("complete"))
+
+    def writer(self, metadata: Optional[Dict[str, Any]] = None, compression_level: int = 1) -> "StageWriter":
+        """Start writing the stage from scratch, replacing any earlier contents"""
+        self.discard()
+        os.makedirs(self.path)
+        return StageWriter(self, metadata or {}, compression_level)
+
+    def read(self, start_frame: int = 0, stop_frame: Optional[int] = None) -> Iterator[RecordBatch]:
+        """Yield the staged batches from frame start_frame up to, not including, stop_frame.
+
+        Earlier frames are skipped by their length header without being decompressed.
+        """
+        manifest = self.manifest
+        if not manifest or not manifest.get("complete"):
+            raise ValueError(f"Stage {self.stage_id} is not complete")
+        codec = manifest["codec"]
+
+        with open(os.path.join(self.path, DATA_FILE), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            # Frames are read straight from the page cache instead of through file reads
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offset = 0
+                frames = manifest["frames"] if stop_frame is None else min(stop_frame, manifest["frames"])
+                for frame in range(frames):
+                    (length,) = FRAME_HEADER.unpack_from(data, offset)
+                    offset += FRAME_HEADER.size
+                    if frame >= start_frame:
+                        columns, values, partition = _decode(codec, zlib.decompress(data[offset:offset + length]))
+                        yield RecordBatch(columns, values, partition)
+                    offset += length
+
+    def discard(self) -> None:
+        """Delete the stage's files"""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+class StageWriter:
+    """Appends batches to a stage; close(complete=True) publishes it for loading"""
+    def __init__(self, stage: StagingArea, metadata: Dict[str, Any], compression_level: int = 1):
+        self.stage = stage
+        self.metadata = metadata
+        self.compression_level = compression_level
+        self.codec = "msgpack" if msgpack is not None else "pickle"
+        self.frames = 0
+        self.rows = 0
+        self.bytes_written = 0
+        self._file = open(os.path.join(stage.path, DATA_FILE), "wb")
+
+    def write(self, batch: RecordBatch) -> None:
+        payload = zlib.compress(_encode(self.codec, [batch.columns, batch.data, batch.partition]), self.compression_level)
+        self._file.write(FRAME_HEADER.pack(len(payload)))
+        self._file.write(payload)
+        self.frames += 1
+        self.rows += batch.num_rows
+        self.bytes_written += FRAME_HEADER.size + len(payload)
+
+    def close(self, complete: bool = True) -> None:
+        """Flush the data file and write the manifest"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+        manifest = dict(self.metadata)
+        manifest.update({
+            "stage_id": self.stage.stage_id,
+            "codec": self.codec,
+            "compression": "zlib",
+            "frames": self.frames,
+            "rows": self.rows,
+            "bytes": self.bytes_written,
+            "complete": complete,
+            "written_at": time.time()
+        })
+        # Replace the manifest atomically so readers never see a partial one
+        manifest_path = os.path.join(self.stage.path, MANIFEST_FILE)
+        with open(manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(manifest_path + ".tmp", manifest_path)
@@ -0,0 +1,144 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from ..connectors.record_batch import RecordBatch
+
+# Registry of transformation name -> (factory, multi_source). A factory takes the mapping's
+# transformation_args and returns a function applied to one value, or to a tuple of values
+# for multi-source transforms such as concat.
+TRANSFORMS: Dict[str, Tuple[Callable[..., Callable[[Any], Any]], bool]] = {}
+
+# Marks an omitted transform argument where None is a meaningful value
+_MISSING = object()
+
+CAST_TYPES = {
+    "int": int,
+    "float": float,
+    "str": str,
+    "decimal": lambda value: Decimal(str(value)),
+    "bool": lambda value: value.strip().lower() in ("1", "true", "yes", "y", "t") if isinstance(value, str) else bool(value),
+}
+
+def register_transform(name: str, multi_source: bool = False) -> Callable:
+    """Register a transformation factory under name"""
+    def decorator(factory: Callable[..., Callable[[Any], Any]]) -> Callable[..., Callable[[Any], Any]]:
+        TRANSFORMS[name] = (factory, multi_source)
+        return factory
+    return decorator
+
+def _null_safe(func: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap a value function so None passes through untouched"""
+    return lambda value: func(value) if value is not None else None
+
+@register_transform("upper")
+def _upper() -> Callable[[Any], Any]:
+    return _null_safe(lambda value: str(value).upper())
+
+@register_transform("lower")
+def _lower() -> Callable[[Any], Any]:
+    return _null_safe(lambda value: str(value).lower())
+
+@register_transform("strip")
+def _strip() -> Callable[[Any], Any]:
+    return _null_safe(lambda value: str(value).strip())
+
+@register_transform("cast")
+def _cast(type: str = "str") -> Callable[[Any], Any]:
+    if type not in CAST_TYPES:
+        raise ValueError(f"Unknown cast type: {type}")
+    return _null_safe(CAST_TYPES[type])
+
+@register_transform("date")
+def _date(format: str = "%Y-%m-%d", as_date: bool = False) -> Callable[[Any], Any]:
+    def parse(value: Any) -> Any:
+        if not isinstance(value, (date, datetime)):
+            value = datetime.strptime(str(value), format)
+        if as_date and isinstance(value, datetime):
+            return value.date()
+        return value
+    return _null_safe(parse)
+
+@register_transform("default")
+def _default(value: Any = None) -> Callable[[Any], Any]:
+    fallback = value
+    return lambda value: fallback if value is None else value
+
+@register_transform("lookup")
+def _lookup(table: Optional[Dict[Any, Any]] = None, default: Any = _MISSING) -> Callable[[Any], Any]:
+    table = table or {}
+    if default is _MISSING:
+        # Unmatched values pass through unchanged
+        return lambda value: table.get(value, value)
+    return lambda value: table.get(value, default)
+
+@register_transform("concat", multi_source=True)
+def _concat(fields: Optional[List[str]] = None, separator: str = "") -> Callable[[Any], Any]:
+    return lambda values: separator.join(str(value) for value in values if value is not None)
+
+class CompiledMapping:
+    """A field mapping resolved to its source fields and value function"""
+    def __init__(self, source_fields: List[str], target_field: str, func: Optional[Callable[[Any], Any]], multi_source: bool):
+        self.source_fields = source_fields
+        self.target_field = target_field
+        self.func = func
+        self.multi_source = multi_source
+
+class TransformPlan:
+    """Field mappings compiled once per job and applied a column at a time"""
+    def __init__(self, mappings: List[CompiledMapping]):
+        self.mappings = mappings
+
+    def apply_batch(self, batch: RecordBatch) -> RecordBatch:
+        """Transform a columnar batch; mappings whose source column is absent are skipped"""
+        target_fields = []
+        columns = []
+
+        for mapping in self.mappings:
+            if mapping.source_fields[0] not in batch.column_index:
+                continue
+
+            if mapping.multi_source:
+                sources = [
+                    batch.column(field) if field in batch.column_index else [None] * batch.num_rows
+                    for field in mapping.source_fields
+                ]
+                values = list(map(mapping.func, zip(*sources)))
+            elif mapping.func is None:
+                # Untransformed columns are shared with the source batch, not copied
+                values = batch.column(mapping.source_fields[0])
+            else:
+                values = list(map(mapping.func, batch.column(mapping.source_fields[0])))
+
+            target_fields.append(mapping.target_field)
+            columns.append(values)
+
+        return RecordBatch(target_fields, columns)
+
+def compile_mapping(mapping: Any, converter: Optional[Callable[[Any], Any]] = None) -> CompiledMapping:
+    """Resolve a MappingDefinition's transformation through the registry.
+
+    converter, the type conversion for an untransformed mapping, becomes its value function.
+    """
+    if not mapping.transformation:
+        return CompiledMapping([mapping.source_field], mapping.target_field, converter, False)
+
+    if mapping.transformation not in TRANSFORMS:
+        raise ValueError(f"Unknown transformation: {mapping.transformation}")
+
+    factory, multi_source = TRANSFORMS[mapping.transformation]
+    args = dict(mapping.transformation_args or {})
+    func = factory(**args)
+
+    source_fields = [mapping.source_field]
+    if multi_source:
+        source_fields += [field for field in args.get("fields", []) if field != mapping.source_field]
+
+    return CompiledMapping(source_fields, mapping.target_field, func, multi_source)
+
+def compile_mappings(mappings: List[Any], converters: Optional[Dict[str, Callable[[Any], Any]]] = None) -> TransformPlan:
+    """Compile a job's field mappings into a TransformPlan, with type converters by target field"""
+    converters = converters or {}
+    return TransformPlan([
+        compile_mapping(mapping, converters.get(mapping.target_field) if not mapping.transformation else None)
+        for mapping in mappings
+    ])
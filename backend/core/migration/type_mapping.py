@@ -0,0 +1,217 @@
+import re
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from ..connectors.base import SchemaObject
+from .project import table_key
+from .transforms import _null_safe
+
+# Logical kind of each column type name, shared by most engines
+TYPE_KINDS: Dict[str, str] = {}
+for _kind, _names in {
+    "integer": ["tinyint", "smallint", "int", "integer", "bigint", "mediumint", "int2", "int4", "int8",
+                "serial", "bigserial", "smallserial"],
+    "decimal": ["decimal", "numeric", "money", "smallmoney", "number"],
+    "float": ["float", "real", "double", "double precision", "float4", "float8"],
+    "boolean": ["bit", "bool", "boolean"],
+    "string": ["char", "varchar", "nchar", "nvarchar", "text", "ntext", "character", "character varying",
+               "string", "clob", "sysname", "xml", "json", "jsonb"],
+    "binary": ["binary", "varbinary", "image", "bytea", "blob", "rowversion"],
+    "uuid": ["uniqueidentifier", "uuid"],
+    "datetime": ["datetime", "datetime2", "smalldatetime", "timestamp", "timestamp without time zone"],
+    "datetimeoffset": ["datetimeoffset", "timestamptz", "timestamp with time zone"],
+    "date": ["date"],
+    "time": ["time", "time without time zone"],
+}.items():
+    for _name in _names:
+        TYPE_KINDS[_name] = _kind
+
+# Per connector_type overrides where an engine gives a shared name another meaning
+DIALECT_TYPE_KINDS: Dict[str, Dict[str, str]] = {
+    # SQL Server's timestamp is a synonym for rowversion
+    "sqlserver": {"timestamp": "binary"},
+}
+
+# Registry of (source kind, target kind) -> converter factory. A factory returns the function
+# applied to each non-null value, or None when values can be passed through unchanged.
+# Converters run in the transform stage, where an exception fails the whole job, so only
+# conversions that accept every value of their source kind are registered. Parsing text into
+# numbers, dates or uuids, and narrowing to integers (NaN has no integer form), are left to the
+# target, which applies its own conversion rules and rejects bad rows at load.
+CONVERTERS: Dict[Tuple[str, str], Callable[[], Optional[Callable[[Any], Any]]]] = {}
+
+# Resolved converters by (source dialect, source type, target dialect, target type)
+_converter_cache: Dict[Tuple[Optional[str], str, Optional[str], str], Optional[Callable[[Any], Any]]] = {}
+
+_TYPE_ARGUMENTS = re.compile(r"\s*\(.*\)\s*$")
+
+def normalize_type(data_type: str) -> str:
+    """Lowercase a type name and drop quoting and length/precision, e.g. [NVARCHAR](max) -> nvarchar"""
+    return _TYPE_ARGUMENTS.sub("", data_type.strip()).strip("[]\"` ").lower()
+
+def type_kind(data_type: Optional[str], dialect: Optional[str] = None) -> Optional[str]:
+    """Logical kind of a column type, or None for types without conversions"""
+    if not data_type:
+        return None
+    name = normalize_type(data_type)
+    return DIALECT_TYPE_KINDS.get(dialect or "", {}).get(name) or TYPE_KINDS.get(name)
+
+def register_converter(source_kind: str, target_kind: str) -> Callable:
+    """Register a converter factory for values of source_kind written to target_kind"""
+    def decorator(factory: Callable[[], Optional[Callable[[Any], Any]]]) -> Callable[[], Optional[Callable[[Any], Any]]]:
+        CONVERTERS[(source_kind, target_kind)] = factory
+        return factory
+    return decorator
+
+def resolve_converter(source_type: Optional[str], target_type: Optional[str],
+                      source_dialect: Optional[str] = None, target_dialect: Optional[str] = None) -> Optional[Callable[[Any], Any]]:
+    """Converter for one source/target column type pair; None when values pass through unchanged.
+
+    Converters are built once per type pair and cached for every later column and job.
+    """
+    if not source_type or not target_type:
+        return None
+    cache_key = (source_dialect, normalize_type(source_type), target_dialect, normalize_type(target_type))
+    if cache_key in _converter_cache:
+        return _converter_cache[cache_key]
+
+    factory = CONVERTERS.get((type_kind(source_type, source_dialect), type_kind(target_type, target_dialect)))
+    func = factory() if factory else None
+    converter = _null_safe(func) if func else None
+    _converter_cache[cache_key] = converter
+    return converter
+
+def column_types(schema: List[SchemaObject], object_name: str) -> Dict[str, str]:
+    """Column name -> data type of one object in a connector's schema; empty when it is not found.
+
+    An object listed under exactly object_name wins over one matching only its unqualified name.
+    """
+    key = table_key(object_name)
+    matches = [schema_object for schema_object in schema if schema_object.name == object_name] or [
+        schema_object for schema_object in schema if table_key(schema_object.name) == key
+    ]
+    return {field.name: field.data_type for field in matches[0].fields} if matches else {}
+
+def compile_type_converters(mappings: List[Any], source_types: Dict[str, str], target_types: Dict[str, str],
+                            source_dialect: Optional[str] = None, target_dialect: Optional[str] = None) -> Dict[str, Callable[[Any], Any]]:
+    """Target field -> converter for the job's untransformed mappings whose types need one.
+
+    Mappings with a transformation produce values of the transformation's choosing, so
+    they are left alone.
+    """
+    converters = {}
+    for mapping in mappings:
+        if mapping.transformation:
+            continue
+        converter = resolve_converter(source_types.get(mapping.source_field), target_types.get(mapping.target_field),
+                                      source_dialect, target_dialect)
+        if converter:
+            converters[mapping.target_field] = converter
+    return converters
+
+def _as_uuid(value: Any) -> uuid.UUID:
+    if isinstance(value, uuid.UUID):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return uuid.UUID(bytes=bytes(value))
+    return uuid.UUID(str(value))
+
+def _to_bytes(value: Any) -> bytes:
+    return value if type(value) is bytes else bytes(value)
+
+def _utc_naive(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def _offset_text(value: datetime) -> str:
+    # pyodbc binds datetime parameters without their offset, so aware values go as ISO 8601 text
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+
+@register_converter("decimal", "float")
+def _decimal_to_float() -> Callable[[Any], Any]:
+    return float
+
+@register_converter("boolean", "integer")
+def _to_int() -> Callable[[Any], Any]:
+    return int
+
+@register_converter("decimal", "string")
+def _decimal_to_string() -> Callable[[Any], Any]:
+    # Fixed-point text; str() would give scientific notation for small or large values
+    return lambda value: format(value, "f")
+
+@register_converter("float", "decimal")
+def _float_to_decimal() -> Callable[[Any], Any]:
+    # Through repr so 0.1 becomes Decimal("0.1"), not its binary expansion
+    return lambda value: Decimal(repr(value))
+
+@register_converter("integer", "decimal")
+def _integer_to_decimal() -> Callable[[Any], Any]:
+    return Decimal
+
+@register_converter("integer", "float")
+def _integer_to_float() -> Callable[[Any], Any]:
+    return float
+
+@register_converter("integer", "boolean")
+def _integer_to_boolean() -> Callable[[Any], Any]:
+    return bool
+
+@register_converter("integer", "string")
+@register_converter("float", "string")
+def _to_string() -> Callable[[Any], Any]:
+    return str
+
+@register_converter("boolean", "string")
+def _boolean_to_string() -> Callable[[Any], Any]:
+    return lambda value: "1" if value else "0"
+
+@register_converter("uuid", "string")
+def _uuid_to_string() -> Callable[[Any], Any]:
+    return lambda value: str(_as_uuid(value))
+
+@register_converter("uuid", "binary")
+def _uuid_to_binary() -> Callable[[Any], Any]:
+    return lambda value: _as_uuid(value).bytes
+
+@register_converter("binary", "binary")
+def _binary_to_binary() -> Callable[[Any], Any]:
+    # Some drivers return bytearray or memoryview, which not every target driver binds
+    return _to_bytes
+
+@register_converter("binary", "string")
+def _binary_to_string() -> Callable[[Any], Any]:
+    return lambda value: _to_bytes(value).hex()
+
+@register_converter("string", "binary")
+def _string_to_binary() -> Callable[[Any], Any]:
+    return lambda value: value.encode("utf-8")
+
+@register_converter("datetimeoffset", "datetimeoffset")
+@register_converter("datetime", "datetimeoffset")
+def _to_offset_text() -> Callable[[Any], Any]:
+    return _offset_text
+
+@register_converter("datetimeoffset", "datetime")
+def _offset_to_datetime() -> Callable[[Any], Any]:
+    # Targets without an offset store the instant in UTC
+    return _utc_naive
+
+@register_converter("datetimeoffset", "date")
+def _offset_to_date() -> Callable[[Any], Any]:
+    return lambda value: _utc_naive(value).date()
+
+@register_converter("datetime", "date")
+def _datetime_to_date() -> Callable[[Any], Any]:
+    return lambda value: value.date() if isinstance(value, datetime) else value
+
+@register_converter("date", "datetime")
+def _date_to_datetime() -> Callable[[Any], Any]:
+    return lambda value: value if isinstance(value, datetime) else datetime.combine(value, time())
+
+@register_converter("datetimeoffset", "string")
+@register_converter("datetime", "string")
+@register_converter("date", "string")
+@register_converter("time", "string")
+def _to_iso_text() -> Callable[[Any], Any]:
+    return lambda value: value.isoformat() if isinstance(value, (date, time)) else str(value)
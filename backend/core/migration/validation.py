@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+from datetime import date, time
+from decimal import Decimal
+from typing import Dict, List, Any, Tuple, AsyncIterator
+from ..connectors.base import BaseConnector
+from ..connectors.record_batch import RecordBatch, as_record_batch
+
+# "server" checksums key ranges in the database, "client" streams row hashes, "auto" picks server when both sides can
+VALIDATION_METHODS = ("auto", "server", "client")
+
+# Row hashes are summed modulo 2**64 so a bucket's digest does not depend on row order
+HASH_MASK = (1 << 64) - 1
+
+def canonical_value(value: Any) -> str:
+    """Engine-neutral text form of a value, so equal values hash alike across drivers"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, Decimal):
+        if value == value.to_integral_value():
+            return str(int(value))
+        return format(value.normalize(), "f")
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return str(value)
+
+def row_hash(values: List[Any]) -> int:
+    """64-bit hash of a row's values in canonical form"""
+    digest = hashlib.blake2b("\x1f".join(canonical_value(value) for value in values).encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+class MigrationValidator:
+    """Compares a source table with its migrated target by row count and per-range checksums.
+
+    When both connectors offer range_checksums (SQL Server) the checksums are computed
+    server-side over key ranges; mismatched ranges are split and checked again until they
+    are small enough to compare row by row. Other connectors are compared client-side by
+    streaming both tables once into hash buckets, then streaming again to diff the rows of
+    mismatched buckets only.
+
+    columns pairs each source column with its target column; key is the (source, target)
+    key column pair and must be among them.
+    """
+    def __init__(self,
+                 source: BaseConnector,
+                 target: BaseConnector,
+                 source_object: str,
+                 target_object: str,
+                 columns: List[Tuple[str, str]],
+                 key: Tuple[str, str],
+                 method: str = "auto",
+                 partitions: int = 16,
+                 leaf_rows: int = 10000,
+                 max_depth: int = 8,
+                 max_samples: int = 100):
+        if method not in VALIDATION_METHODS:
+            raise ValueError(f"Unknown validation method: {method}")
+        self.source = source
+        self.target = target
+        self.source_object = source_object
+        self.target_object = target_object
+        self.columns = columns
+        self.key = key
+        self.method = method
+        self.partitions = max(partitions, 1)
+        # Ranges with at most this many rows are compared row by row instead of split further
+        self.leaf_rows = leaf_rows
+        self.max_depth = max_depth
+        self.max_samples = max_samples
+
+    async def validate(self) -> Dict[str, Any]:
+        """Run the comparison and report counts, mismatched ranges and sample differing keys"""
+        server = self.method == "server" or (self.method == "auto" and all(
+            hasattr(connector, "range_checksums") and hasattr(connector, "get_key_ranges")
+            for connector in (self.source, self.target)
+        ))
+        result = {
+            "method": "server" if server else "client",
+            "ranges_checked": 0,
+            "mismatched_ranges": [],
+            "missing_keys": [],
+            "extra_keys": [],
+            "changed_keys": [],
+            "checksum_only_ranges": []
+        }
+
+        if server:
+            result["source_rows"], result["target_rows"] = await asyncio.gather(
+                self.source.count_rows(self.source_object),
+                self.target.count_rows(self.target_object)
+            )
+            ranges = await self.source.get_key_ranges(self.source_object, self.key[0], self.partitions)
+            await self._compare_ranges(ranges, 0, result)
+        else:
+            await self._compare_buckets(result)
+
+        result["status"] = "passed" if (
+            result["source_rows"] == result["target_rows"] and not result["mismatched_ranges"]
+        ) else "failed"
+        return result
+
+    async def _compare_ranges(self, ranges: List[Tuple[Any, Any]], depth: int, result: Dict[str, Any]) -> None:
+        """Checksum ranges on both sides and drill into the ones that differ"""
+        source_columns = [source for source, _ in self.columns]
+        target_columns = [target for _, target in self.columns]
+        # Both sides are aggregated at the same time, each on its own connection
+        source_sums, target_sums = await asyncio.gather(
+            self.source.range_checksums(self.source_object, self.key[0], source_columns, ranges),
+            self.target.range_checksums(self.target_object, self.key[1], target_columns, ranges)
+        )
+        result["ranges_checked"] += len(ranges)
+
+        for (lower, upper), source_sum, target_sum in zip(ranges, source_sums, target_sums):
+            if source_sum == target_sum:
+                continue
+            rows = max(source_sum[0], target_sum[0])
+            if rows > self.leaf_rows and depth < self.max_depth:
+                sub_ranges = await self.source.get_key_ranges(self.source_object, self.key[0], self.partitions, lower, upper)
+                if len(sub_ranges) > 1:
+                    await self._compare_ranges(sub_ranges, depth + 1, result)
+                    continue
+            source_rows = await self._range_row_hashes(self.source, self.source_object, 0, lower, upper)
+            target_rows = await self._range_row_hashes(self.target, self.target_object, 1, lower, upper)
+            mismatch = {"lower": lower, "upper": upper, "source_rows": source_sum[0], "target_rows": target_sum[0]}
+            if self._diff_rows(source_rows, target_rows, result):
+                result["mismatched_ranges"].append(mismatch)
+            else:
+                # BINARY_CHECKSUM depends on column types, so equal values in differently typed
+                # columns can checksum differently; those ranges match row by row and pass
+                result["checksum_only_ranges"].append(mismatch)
+
+    async def _range_row_hashes(self, connector: BaseConnector, object_name: str, side: int,
+                                lower: Any, upper: Any) -> Dict[Any, int]:
+        """Key -> row hash for every row of one key range"""
+        key_column = self.key[side]
+        query, params = connector._build_range_select(object_name, key_column, lower, upper)
+        hashes = {}
+        async for batch in connector.iter_batches(query=query, params=params, compact=True):
+            self._hash_batch(as_record_batch(batch), side, hashes)
+        return hashes
+
+    async def _compare_buckets(self, result: Dict[str, Any]) -> None:
+        """Client-side comparison: hash both tables into key buckets, then diff the mismatched ones"""
+        (source_rows, source_buckets), (target_rows, target_buckets) = await asyncio.gather(
+            self._bucket_digests(self.source, self.source_object, 0),
+            self._bucket_digests(self.target, self.target_object, 1)
+        )
+        result["source_rows"] = source_rows
+        result["target_rows"] = target_rows
+        result["ranges_checked"] = self.partitions
+
+        mismatched = {bucket for bucket in range(self.partitions) if source_buckets[bucket] != target_buckets[bucket]}
+        for bucket in sorted(mismatched):
+            result["mismatched_ranges"].append({
+                "bucket": bucket,
+                "source_rows": source_buckets[bucket][0],
+                "target_rows": target_buckets[bucket][0]
+            })
+        if mismatched:
+            source_hashes, target_hashes = await asyncio.gather(
+                self._bucket_row_hashes(self.source, self.source_object, 0, mismatched),
+                self._bucket_row_hashes(self.target, self.target_object, 1, mismatched)
+            )
+            self._diff_rows(source_hashes, target_hashes, result)
+
+    async def _bucket_digests(self, connector: BaseConnector, object_name: str, side: int) -> Tuple[int, List[Tuple[int, int]]]:
+        """Total rows plus (row count, summed row hash) per key bucket"""
+        counts = [0] * self.partitions
+        sums = [0] * self.partitions
+        total = 0
+        async for batch in self._iter_rows(connector, object_name):
+            hashes = self._hash_batch(batch, side, {})
+            for key_value, value_hash in hashes.items():
+                bucket = self._bucket(key_value)
+                counts[bucket] += 1
+                sums[bucket] = (sums[bucket] + value_hash) & HASH_MASK
+            total += batch.num_rows
+        return total, list(zip(counts, sums))
+
+    async def _bucket_row_hashes(self, connector: BaseConnector, object_name: str, side: int,
+                                 buckets: set) -> Dict[Any, int]:
+        hashes = {}
+        async for batch in self._iter_rows(connector, object_name):
+            for key_value, value_hash in self._hash_batch(batch, side, {}).items():
+                if self._bucket(key_value) in buckets:
+                    hashes[key_value] = value_hash
+        return hashes
+
+    async def _iter_rows(self, connector: BaseConnector, object_name: str) -> AsyncIterator[RecordBatch]:
+        if hasattr(connector, "iter_batches"):
+            compact = getattr(connector, "supports_record_batch", False)
+            async for batch in connector.iter_batches(object_name, compact=compact):
+                yield as_record_batch(batch)
+        else:
+            records = await connector.extract_data(object_name=object_name)
+            if records:
+                yield RecordBatch.from_records(records)
+
+    def _hash_batch(self, batch: RecordBatch, side: int, hashes: Dict[Any, int]) -> Dict[Any, int]:
+        """Add key -> row hash for a batch's rows, using the compared columns of one side"""
+        keys = [canonical_value(value) for value in batch.column(self.key[side])]
+        value_columns = [batch.column(pair[side]) for pair in self.columns]
+        for i, key_value in enumerate(keys):
+            hashes[key_value] = row_hash([values[i] for values in value_columns])
+        return hashes
+
+    def _bucket(self, key_value: str) -> int:
+        return row_hash([key_value]) % self.partitions
+
+    def _diff_rows(self, source_hashes: Dict[Any, int], target_hashes: Dict[Any, int], result: Dict[str, Any]) -> int:
+        """Record up to max_samples keys missing from, extra in, or changed in the target; returns the number of differences"""
+        differences = 0
+        for key_value, value_hash in source_hashes.items():
+            if key_value not in target_hashes:
+                self._sample(result["missing_keys"], key_value)
+                differences += 1
+            elif target_hashes[key_value] != value_hash:
+                self._sample(result["changed_keys"], key_value)
+                differences += 1
+        for key_value in target_hashes:
+            if key_value not in source_hashes:
+                self._sample(result["extra_keys"], key_value)
+                differences += 1
+        return differences
+
+    def _sample(self, samples: List[Any], key_value: Any) -> None:
+        if len(samples) < self.max_samples:
+            samples.append(key_value)
@@ -0,0 +1,143 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+from backend.benchmarks.fakes import InMemoryConnector
+from backend.core.connectors.base import ConnectorConfig
+from backend.core.connectors.record_batch import RecordBatch
+from backend.core.migration.checkpoint import CheckpointStore, CheckpointTracker
+from backend.core.migration.engine import MigrationEngine, MigrationConfig, MappingDefinition
+from backend.core.migration.instrumentation import Instrumentation
+
+ROWS = 10000
+
+class KeysetSource(InMemoryConnector):
+    """Source with integer keys 0..rows-1 read in key order over [lower, upper) ranges"""
+    def __init__(self, rows: int):
+        super().__init__(ConnectorConfig(), RecordBatch(["id", "value"], [list(range(rows)), [f"v{i}" for i in range(rows)]]))
+
+    async def get_primary_key(self, object_name: str) -> List[str]:
+        return ["id"]
+
+    async def iter_partitioned_batches(self, object_name: str, batch_size: int, partitions: int, compact: bool = False,
+                                       key_column: Optional[str] = None, ranges: Optional[List[Tuple[Any, Any]]] = None,
+                                       resume_after: Optional[List[Any]] = None, groups: Optional[List[int]] = None):
+        ids = self.rows.column("id")
+        for index, ((lower, upper), after) in enumerate(zip(ranges, resume_after)):
+            keys = [key for key in ids
+                    if (key > after if after is not None else lower is None or key >= lower)
+                    and (upper is None or key < upper)]
+            for start in range(0, len(keys), batch_size):
+                chunk = keys[start:start + batch_size]
+                yield RecordBatch(["id", "value"], [chunk, [f"v{key}" for key in chunk]], index)
+
+class SlowTarget(InMemoryConnector):
+    """Target that commits each batch from a worker thread; the batch holding fail_key fails.
+
+    State is kept on the class because each loader worker gets its own clone.
+    """
+    inserted: List[int] = []
+    fail_key: Optional[int] = None
+
+    async def load_data(self, target_object: str, data: Any, **kwargs: Any) -> int:
+        return await asyncio.to_thread(self._insert, data)
+
+    def _insert(self, batch: RecordBatch) -> int:
+        keys = batch.column("id")
+        if self.fail_key is not None and self.fail_key in keys:
+            # Fail late, once the other loaders have committed later batches
+            time.sleep(0.05)
+            raise RuntimeError("load failed")
+        time.sleep(0.01)
+        self.inserted.extend(keys)
+        return len(keys)
+
+def _config(source: InMemoryConnector, store: CheckpointStore) -> MigrationConfig:
+    return MigrationConfig(source, SlowTarget(ConnectorConfig()), "source", "target",
+                           [MappingDefinition("id", "id"), MappingDefinition("value", "value")],
+                           batch_size=500, loader_workers=3, job_id="job", checkpoint_store=store,
+                           convert_types=False)
+
+def test_resume_after_out_of_order_commits_loads_each_row_once(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    source = KeysetSource(ROWS)
+    inserted = SlowTarget.inserted = []
+
+    # Batch 2 (keys 1000-1499) fails while later batches commit on other loaders
+    SlowTarget.fail_key = 1000
+    failed = asyncio.run(MigrationEngine(Instrumentation()).migrate(_config(source, store)))
+    assert failed["status"] == "failed"
+    assert 1000 not in inserted
+    assert len(inserted) > 1000
+
+    state = store.load("job")
+    assert state["partitions"][0]["after"] == 999
+    assert state["partitions"][0]["committed_ahead"]
+
+    SlowTarget.fail_key = None
+    resumed = asyncio.run(MigrationEngine(Instrumentation()).migrate(_config(source, store), resume=True))
+    assert resumed["status"] == "completed"
+    assert sorted(inserted) == list(range(ROWS))
+    assert resumed["success_count"] == ROWS
+
+def test_resume_splits_partitions_around_committed_batches(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    tracker = CheckpointTracker.start(store, "job", "source", "target", "id", [(None, None)])
+    tracker.commit(0, 0, 0, 99, 100, 100)
+    tracker.commit(0, 2, 200, 299, 100, 100)
+    tracker.commit(0, 4, 400, 499, 100, 100)
+
+    resumed = CheckpointTracker.resume(store, "job", store.load("job"))
+    assert list(zip(resumed.ranges, resumed.resume_after)) == [
+        ((None, 200), 99),
+        ((299, 400), 299),
+        ((499, None), 499)
+    ]
+    # The gaps of one partition are read one after another over a single connection
+    assert resumed.groups == [0, 0, 0]
+    assert resumed.state["processed_records"] == 300
+
+def test_consecutive_committed_batches_merge_into_one_span(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    tracker = CheckpointTracker.start(store, "job", "source", "target", "id", [(None, 1000), (1000, None)])
+    for seq in [2, 3, 4, 6]:
+        tracker.commit(0, seq, seq * 100, seq * 100 + 99, 100, 100)
+
+    state = store.load("job")
+    assert state["partitions"][0]["committed_ahead"] == [[2, 4, 200, 499], [6, 6, 600, 699]]
+    resumed = CheckpointTracker.resume(store, "job", state)
+    assert list(zip(resumed.ranges, resumed.resume_after, resumed.groups)) == [
+        ((None, 200), None, 0),
+        ((499, 600), 499, 0),
+        ((699, 1000), 699, 0),
+        ((1000, None), None, 1)
+    ]
+
+def test_checkpoint_store_keeps_key_and_watermark_types(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    tracker = CheckpointTracker.start(store, "job", "source", "target", "modified_at",
+                                      [(None, datetime(2024, 1, 1)), (datetime(2024, 1, 1), None)])
+    tracker.commit(0, 0, datetime(2023, 1, 1), datetime(2023, 6, 30, 12, 30), 10, 10)
+    tracker.commit(1, 1, datetime(2024, 3, 1), datetime(2024, 3, 2), 10, 10)
+
+    state = store.load("job")
+    assert state["partitions"][0]["upper"] == datetime(2024, 1, 1)
+    assert state["partitions"][0]["after"] == datetime(2023, 6, 30, 12, 30)
+    assert state["partitions"][1]["committed_ahead"] == [[1, 1, datetime(2024, 3, 1), datetime(2024, 3, 2)]]
+
+    for watermark in [datetime(2024, 5, 1, 8, 0), Decimal("10.50"), uuid.uuid4(), b"\x00\x00\x07\xd1", 42, "text"]:
+        store.save_watermark("sync", watermark)
+        assert store.load_watermark("sync") == watermark
+        assert type(store.load_watermark("sync")) is type(watermark)
+
+def test_default_sync_id_names_both_connections(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    first, second = KeysetSource(10), KeysetSource(10)
+    first.config = ConnectorConfig(credentials={"server": "db1", "database": "Sales", "password": "secret"})
+    second.config = ConnectorConfig(credentials={"server": "db2", "database": "Sales", "password": "secret"})
+
+    first_id, second_id = _config(first, store).sync_id, _config(second, store).sync_id
+    assert first_id != second_id
+    assert "server=db2" in second_id and "secret" not in second_id
@@ -0,0 +1,73 @@
+import asyncio
+import time
+import pytest
+from backend.core.connectors.pool import ConnectionPool, PoolTimeoutError, close_pools, get_pool
+
+class Connection:
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+@pytest.fixture(autouse=True)
+def pools():
+    close_pools()
+    yield
+    close_pools()
+
+def test_fill_opens_min_size_connections():
+    opened = []
+    pool = ConnectionPool(lambda: opened.append(Connection()) or opened[-1], min_size=3, max_size=5)
+    pool.fill()
+    assert (pool.size, pool.idle, len(opened)) == (3, 3, 3)
+
+def test_new_pool_is_filled_in_the_background():
+    pool = get_pool("key", Connection, min_size=2, max_size=5)
+    deadline = time.monotonic() + 5
+    while pool.idle < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert (pool.size, pool.idle) == (2, 2)
+
+def test_get_pool_rejects_conflicting_options():
+    health_check = lambda connection: None
+    pool = get_pool("key", Connection, max_size=5, health_check=health_check)
+    # Callables such as the health check are rebuilt by every caller and not compared
+    assert get_pool("key", Connection, max_size=5, health_check=lambda connection: None) is pool
+    with pytest.raises(ValueError):
+        get_pool("key", Connection, max_size=10, health_check=health_check)
+
+def test_acquire_async_waits_on_the_event_loop():
+    pool = ConnectionPool(Connection, max_size=1)
+
+    async def use(order: list, index: int) -> None:
+        connection = await pool.acquire_async(timeout=5)
+        order.append(index)
+        await asyncio.sleep(0.01)
+        pool.release(connection)
+
+    async def run() -> list:
+        order = []
+        await asyncio.gather(*(use(order, index) for index in range(20)))
+        return order
+
+    # Twenty waiters on one connection would need twenty threads if each waited in acquire()
+    assert sorted(asyncio.run(run())) == list(range(20))
+    assert (pool.size, pool.idle) == (1, 1)
+
+def test_acquire_async_times_out_and_passes_on_wakeups():
+    pool = ConnectionPool(Connection, max_size=1)
+
+    async def run():
+        held = await pool.acquire_async()
+        with pytest.raises(PoolTimeoutError):
+            await pool.acquire_async(timeout=0.05)
+        # A waiter cancelled after being woken hands the wake-up to the next one
+        first = asyncio.ensure_future(pool.acquire_async(timeout=5))
+        second = asyncio.ensure_future(pool.acquire_async(timeout=5))
+        await asyncio.sleep(0.01)
+        pool.release(held)
+        first.cancel()
+        return await second
+
+    assert isinstance(asyncio.run(run()), Connection)
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from backend.benchmarks.fakes import InMemoryConnector, make_rows
+from backend.core.connectors.base import ConnectorConfig
+from backend.core.migration.engine import MigrationConfig, MigrationScheduler, MappingDefinition
+
+MAPPINGS = [MappingDefinition("id", "id"), MappingDefinition("col_1", "col_1")]
+
+class UnreachableTarget(InMemoryConnector):
+    async def connect(self) -> None:
+        raise ConnectionError("target down")
+
+class Orders(InMemoryConnector):
+    """The same rows on every instance, so the clones made for verification hold them too.
+
+    Open connections are counted on the class across clones.
+    """
+    connections = 0
+
+    def __init__(self, config: ConnectorConfig):
+        super().__init__(config, make_rows(100, 2))
+
+    async def connect(self) -> None:
+        if not self.connection:
+            self.connection = True
+            Orders.connections += 1
+
+    async def disconnect(self) -> None:
+        if self.connection:
+            self.connection = None
+            Orders.connections -= 1
+
+class CatalogErrorOrders(Orders):
+    """Source whose primary key lookup checks out a connection, then fails"""
+    async def get_primary_key(self, object_name: str):
+        await self.connect()
+        raise RuntimeError("catalog unavailable")
+
+def _config(source: InMemoryConnector, target: InMemoryConnector) -> MigrationConfig:
+    return MigrationConfig(source, target, "source", "target", MAPPINGS, convert_types=False)
+
+def test_failed_connect_ends_the_progress_stream(tmp_path):
+    async def run():
+        scheduler = MigrationScheduler(str(tmp_path / "checkpoints.db"))
+        source = InMemoryConnector(ConnectorConfig(), make_rows(100, 2))
+        job_id = await scheduler.schedule_migration(_config(source, UnreachableTarget(ConnectorConfig())))
+        events = scheduler.get_job_progress(job_id).subscribe()
+        while await asyncio.wait_for(events.get(), timeout=5) is not None:
+            pass
+        while scheduler.get_job_status(job_id)["status"] == "running":
+            await asyncio.sleep(0.01)
+        return scheduler.get_job_status(job_id)
+
+    status = asyncio.run(run())
+    assert status == {"status": "failed", "error": "target down"}
+
+def _verify(tmp_path, source: InMemoryConnector, **options):
+    """Verify a job copying source into an Orders target and return the result"""
+    async def run():
+        scheduler = MigrationScheduler(str(tmp_path / "checkpoints.db"))
+        scheduler.job_configs["job"] = _config(source, Orders(ConnectorConfig()))
+        await scheduler.verify_migration("job", **options)
+        await scheduler._verification_tasks["job"]
+        return scheduler.get_verification("job")
+    return asyncio.run(run())
+
+def test_verify_uses_key_column_for_sources_without_primary_keys(tmp_path):
+    result = _verify(tmp_path, Orders(ConnectorConfig()), key_column="id")
+    assert result["status"] == "passed"
+    assert result["method"] == "client"
+    assert result["source_rows"] == result["target_rows"] == 100
+
+    with pytest.raises(ValueError):
+        _verify(tmp_path, Orders(ConnectorConfig()))
+
+@pytest.mark.parametrize("source_class, options", [
+    (CatalogErrorOrders, {}),
+    (Orders, {"method": "fast"}),
+    (Orders, {"key_column": "col_2"}),
+])
+def test_verify_errors_release_the_source(tmp_path, source_class, options):
+    Orders.connections = 0
+    with pytest.raises((ValueError, RuntimeError)):
+        _verify(tmp_path, source_class(ConnectorConfig()), **options)
+    assert Orders.connections == 0
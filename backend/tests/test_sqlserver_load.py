@@ -0,0 +1,132 @@
+import asyncio
+import math
+import threading
+import time
+import pytest
+from backend.benchmarks.fakes import FakeConnection, FakeCursor, FakePyodbc, make_rows
+from backend.core.connectors.pool import close_pools
+from backend.core.connectors.sqlserver import connector as sqlserver_module
+from backend.core.connectors.sqlserver.connector import (
+    SQLServerConnector, SQLServerConfig, MAX_PARAMETERS, MAX_VALUES_ROWS
+)
+
+ROWS = 2500
+COLUMNS = 10
+
+@pytest.fixture
+def fake(monkeypatch):
+    """Stand in for pyodbc with SQLite and count commits alongside round-trips"""
+    fake = FakePyodbc()
+    fake.commits = 0
+    commit = FakeConnection.commit
+
+    def counting_commit(connection):
+        fake.commits += 1
+        commit(connection)
+
+    monkeypatch.setattr(sqlserver_module, "pyodbc", fake)
+    monkeypatch.setattr(FakeConnection, "commit", counting_commit)
+    # Pools are keyed by connection string, so start without another test's connections
+    close_pools()
+    yield fake
+    close_pools()
+    fake.sqlite.close()
+
+def _connector(**options) -> SQLServerConnector:
+    return SQLServerConnector(SQLServerConfig(credentials={"server": "test", "database": "test"}, **options))
+
+def _load(fake: FakePyodbc, **options) -> int:
+    """Load ROWS rows in one load_data call; returns round-trips, commits excluded"""
+    data = make_rows(ROWS, COLUMNS)
+    fake.create_table("target", data, fill=False)
+    connector = _connector(**options)
+
+    async def run() -> int:
+        await connector.connect()
+        try:
+            # Connecting runs a health check, which is not part of the load
+            fake.counter.round_trips = 0
+            fake.commits = 0
+            return await connector.load_data("target", data)
+        finally:
+            await connector.disconnect()
+
+    assert asyncio.run(run()) == ROWS
+    assert fake.sqlite.execute("SELECT COUNT(*) FROM target").fetchone()[0] == ROWS
+    return fake.counter.round_trips - fake.commits
+
+def test_executemany_sends_each_chunk_in_one_round_trip(fake):
+    assert _load(fake, load_method="executemany") == 1
+    assert fake.commits == 1
+
+def test_values_packs_rows_up_to_the_parameter_limit(fake):
+    rows_per_statement = min(MAX_VALUES_ROWS, (MAX_PARAMETERS - 1) // COLUMNS)
+    assert _load(fake, load_method="values") <= math.ceil(ROWS / rows_per_statement)
+
+def test_row_sends_one_round_trip_per_row(fake):
+    assert _load(fake, load_method="row") == ROWS
+
+def test_commit_interval_commits_once_per_chunk(fake):
+    chunks = math.ceil(ROWS / 1000)
+    assert _load(fake, load_method="executemany", commit_interval=1000) == chunks
+    assert fake.commits == chunks
+
+def test_cancelled_extract_waits_for_the_driver_before_releasing(fake, monkeypatch):
+    fake.create_table("source", make_rows(100, 2))
+    fetching = threading.Event()
+    closed_while_fetching = []
+    fetchmany, close = FakeCursor.fetchmany, FakeCursor.close
+
+    def slow_fetchmany(cursor, size=None):
+        fetching.set()
+        time.sleep(0.2)
+        try:
+            return fetchmany(cursor, size)
+        finally:
+            fetching.clear()
+
+    def checked_close(cursor):
+        closed_while_fetching.append(fetching.is_set())
+        close(cursor)
+
+    monkeypatch.setattr(FakeCursor, "fetchmany", slow_fetchmany)
+    monkeypatch.setattr(FakeCursor, "close", checked_close)
+    connector = _connector()
+
+    async def extract() -> None:
+        try:
+            async for _ in connector.iter_batches(object_name="source"):
+                pass
+        finally:
+            await connector.disconnect()
+
+    async def run() -> None:
+        task = asyncio.ensure_future(extract())
+        while not fetching.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert closed_while_fetching == [False]
+    pool = connector._get_pool()
+    assert (pool.size, pool.idle) == (1, 1)
+
+def test_grouped_ranges_share_a_connection(fake):
+    fake.create_table("source", make_rows(100, 2))
+    connector = _connector()
+
+    async def run() -> list:
+        keys = []
+        try:
+            async for batch in connector.iter_partitioned_batches("source", 10, compact=True, key_column="id",
+                                                                  ranges=[(None, 20), (30, 50), (60, None), (20, 30)],
+                                                                  resume_after=[None, 39, None, None], groups=[0, 0, 0, 1]):
+                keys.extend(batch.column("id"))
+        finally:
+            await connector.disconnect()
+        return keys
+
+    assert sorted(asyncio.run(run())) == list(range(1, 30)) + list(range(40, 50)) + list(range(60, 101))
+    assert connector._get_pool().size == 2
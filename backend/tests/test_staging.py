@@ -0,0 +1,19 @@
+import zlib
+from backend.core.connectors.record_batch import RecordBatch
+from backend.core.migration import staging
+from backend.core.migration.staging import StagingArea
+
+def test_read_decodes_only_the_requested_frames(tmp_path, monkeypatch):
+    stage = StagingArea("job", str(tmp_path))
+    writer = stage.writer()
+    for frame in range(10):
+        writer.write(RecordBatch(["id"], [[frame * 10 + offset for offset in range(10)]]))
+    writer.close()
+
+    decompressed = []
+    decompress = zlib.decompress
+    monkeypatch.setattr(staging.zlib, "decompress", lambda payload: decompressed.append(payload) or decompress(payload))
+    batches = list(stage.read(3, 5))
+    assert [batch.column("id")[0] for batch in batches] == [30, 40]
+    assert len(decompressed) == 2
+    assert [batch.column("id")[0] for batch in stage.read(8)] == [80, 90]
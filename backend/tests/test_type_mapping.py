@@ -0,0 +1,31 @@
+import asyncio
+from typing import Optional
+from backend.benchmarks.fakes import InMemoryConnector
+from backend.core.connectors.base import ConnectorConfig, SchemaField, SchemaObject
+from backend.core.migration.engine import MigrationEngine
+from backend.core.migration.instrumentation import Instrumentation
+from backend.core.migration.type_mapping import column_types
+
+def _orders(name: str, data_type: str) -> SchemaObject:
+    return SchemaObject(name=name, type="table", fields=[SchemaField(name="total", data_type=data_type)])
+
+SCHEMA = [_orders("sales.Orders", "nvarchar"), _orders("dbo.Orders", "decimal")]
+
+class QualifiedCatalog(InMemoryConnector):
+    """Lists both Orders tables; get_object_schema resolves the qualified name"""
+    async def get_schema(self):
+        return SCHEMA
+
+    async def get_object_schema(self, object_name: str) -> Optional[SchemaObject]:
+        return next((obj for obj in SCHEMA if obj.name == object_name), None)
+
+def test_column_types_prefers_the_exact_name():
+    assert column_types(SCHEMA, "dbo.Orders") == {"total": "decimal"}
+    assert column_types(SCHEMA, "sales.Orders") == {"total": "nvarchar"}
+    assert column_types(SCHEMA, "Missing") == {}
+
+def test_job_column_types_come_from_the_named_object():
+    engine = MigrationEngine(Instrumentation())
+    connector = QualifiedCatalog(ConnectorConfig())
+    assert asyncio.run(engine._column_types(connector, "dbo.Orders")) == {"total": "decimal"}
+    assert asyncio.run(engine._column_types(connector, "hr.Orders")) == {}